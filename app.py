@@ -17,6 +17,20 @@ from typing import Optional
 from dotenv import load_dotenv
 # Import custom modules
 from config import Config
+from circuit_breaker import CircuitBreaker, CircuitBreakerSettings, STATE_CLOSED, STATE_OPEN
+from hedging import Hedger, HedgingSettings
+from http_client import HTTPClientSettings, get_shared_http_client
+from response_cache import GenerationCache
+from image_processing import ImagePreprocessor, ImageProcessingSettings
+from retry_policy import RetryPolicy
+from sentiment_analyzer import (
+    STATE_NOT_LOADED,
+    STATE_LOADING,
+    STATE_READY,
+    STATE_DISABLED,
+    SentimentCache,
+    get_sentiment_model
+)
 from content_generator import (
     GeminiContentGenerator,
     ContentRequest,
@@ -88,10 +102,60 @@ def get_content_generator(_config: Config) -> Optional[GeminiContentGenerator]:
         GeminiContentGenerator or None if initialization fails
     """
     try:
+        get_sentiment_model().configure(
+            backend=_config.sentiment_backend,
+            onnx_model_dir=os.path.join(_config.cache_dir or ".cache", "onnx_sentiment")
+        )
+        http_client = get_shared_http_client(HTTPClientSettings(
+            pool_maxsize=_config.http_pool_maxsize,
+            keepalive=_config.http_keepalive,
+            http2=_config.http2,
+            connect_timeout=_config.connect_timeout,
+            read_timeout=_config.read_timeout,
+            warmup=_config.http_warmup
+        ), base_url=_config.gemini_base_url)
+        cache = None
+        if _config.cache_enabled:
+            cache = GenerationCache(
+                max_bytes=_config.cache_max_mb * 1024 * 1024,
+                ttl_seconds=_config.cache_ttl_seconds or None,
+                disk_path=os.path.join(_config.cache_dir, "generations.sqlite3") if _config.cache_dir else None
+            )
         generator = GeminiContentGenerator(
             api_key=_config.gemini_api_key,
-            temperature=_config.temperature
+            temperature=_config.temperature,
+            http_client=http_client,
+            cache=cache,
+            sentiment_batch_size=_config.sentiment_batch_size,
+            retry_policy=RetryPolicy(
+                max_attempts=_config.retry_max_attempts,
+                base_delay=_config.retry_base_delay,
+                max_delay=_config.retry_max_delay,
+                deadline=_config.request_deadline
+            ),
+            sentiment_cache=SentimentCache(
+                max_bytes=_config.sentiment_cache_mb * 1024 * 1024,
+                disk_path=os.path.join(_config.cache_dir, "sentiment.sqlite3") if _config.cache_dir else None
+            ),
+            image_preprocessor=ImagePreprocessor(ImageProcessingSettings(
+                enabled=_config.image_preprocessing,
+                max_pixels=_config.image_max_pixels,
+                output_format=_config.image_format,
+                quality=_config.image_quality
+            )),
+            circuit_breaker=CircuitBreaker(CircuitBreakerSettings(
+                failure_rate_threshold=_config.circuit_failure_rate,
+                slow_call_seconds=_config.circuit_slow_call_seconds,
+                open_seconds=_config.circuit_open_seconds
+            )) if _config.circuit_breaker_enabled else None,
+            hedger=Hedger(HedgingSettings(
+                percentile=_config.hedge_percentile,
+                max_hedge_rate=_config.hedge_max_rate
+            )) if _config.hedging_enabled else None,
+            base_url=_config.gemini_base_url
         )
+        if _config.sentiment_warmup:
+            get_sentiment_model().start_warmup()
         logger.info("Content generator initialized successfully")
         return generator
     except Exception as e:
@@ -143,6 +207,47 @@ def copy_to_clipboard_button(text_to_copy: str, button_text: str = "Copy", key:
     st.components.v1.html(html_code, height=35)
 
 
+# --- Post Rendering ---
+def render_post(index: int, post, key_prefix: str = "") -> None:
+    """
+    Render one generated post with sentiment and a copy button.
+    
+    Args:
+        index: Zero-based position of the post
+        post: GeneratedPost to display
+        key_prefix: Distinguishes copy buttons when posts are grouped
+    """
+    st.markdown("---")
+    st.markdown(f"### 📝 Post #{index+1}")
+    
+    # Display caption with emojis
+    st.write(f"**Caption:** {post.caption} {post.emojis}")
+    
+    # Display hashtags
+    st.write(f"**Hashtags:** {' '.join(post.hashtags)}")
+    
+    # Display GPU-accelerated sentiment analysis
+    if post.sentiment:
+        # Color-code sentiment based on label
+        if "POSITIVE" in post.sentiment:
+            st.success(f"🎯 **Sentiment:** {post.sentiment}")
+        elif "NEGATIVE" in post.sentiment:
+            st.error(f"🎯 **Sentiment:** {post.sentiment}")
+        else:
+            st.info(f"🎯 **Sentiment:** {post.sentiment}")
+    
+    # Copy button
+    post_content = (
+        f"Caption: {post.caption} {post.emojis}\n"
+        f"Hashtags: {' '.join(post.hashtags)}"
+    )
+    copy_to_clipboard_button(
+        post_content,
+        button_text="📋 Copy This Post",
+        key=f"copy_post_{key_prefix}{index}"
+    )
+
+
 # --- Main Application ---
 def main():
     """Main application entry point."""
@@ -176,12 +281,71 @@ def main():
         st.header("⚙️ System Status")
         st.markdown(f"**Environment:** `{config.environment}`")
         st.markdown(f"**Cache:** `{'Enabled' if config.cache_enabled else 'Disabled'}`")
+        if content_generator.cache is not None:
+            cache_stats = content_generator.cache.get_stats()['memory']
+            st.caption(
+                f"Cache hits: {cache_stats['hits']} • misses: {cache_stats['misses']} • "
+                f"evictions: {cache_stats['evictions']}"
+            )
+        
+        image_stats = content_generator.image_preprocessor.get_stats()
+        if image_stats['images_processed']:
+            st.caption(
+                f"🖼️ Images: {image_stats['bytes_saved'] / 1e6:.1f} MB saved "
+                f"in {image_stats['total_ms']:.0f} ms"
+            )
+        
+        flight_stats = content_generator.single_flight.get_stats() if content_generator.single_flight else None
+        if flight_stats and flight_stats['coalesced']:
+            st.caption(f"🔗 Coalesced duplicate calls: {flight_stats['coalesced']}")
+        
+        parse_stats = content_generator.get_parse_stats()
+        if parse_stats['salvaged_responses']:
+            st.caption(
+                f"🩹 Salvaged {parse_stats['salvaged_posts']} post(s) from "
+                f"{parse_stats['salvaged_responses']} malformed response(s)"
+            )
+        
+        token_stats = content_generator.get_token_stats()
+        if token_stats['requests']:
+            st.caption(f"📏 Avg input: ~{token_stats['avg_input_tokens']:.0f} tokens per request")
+        
+        pool_stats = content_generator.http_client.get_stats()
+        st.markdown(
+            f"**API Connections:** `{pool_stats['backend']}` "
+            f"({pool_stats['reused_connections']}/{pool_stats['requests']} reused)"
+        )
+        
+        if content_generator.circuit_breaker is not None:
+            circuit_stats = content_generator.circuit_breaker.get_stats()
+            if circuit_stats['state'] == STATE_CLOSED:
+                st.markdown("**API Circuit:** `Closed` ✅")
+            elif circuit_stats['state'] == STATE_OPEN:
+                st.error(f"🚨 **API Circuit:** Open - retrying in {circuit_stats['retry_in']:.0f}s")
+            else:
+                st.warning("🩺 **API Circuit:** Half-open - probing recovery")
+            st.caption(
+                f"Error rate: {circuit_stats['failure_rate']:.0%} • "
+                f"slow: {circuit_stats['slow_rate']:.0%} • fast-failed: {circuit_stats['rejected']}"
+            )
+        
+        if content_generator.hedger is not None:
+            hedge_stats = content_generator.hedger.get_stats()
+            st.caption(
+                f"🏁 Hedged {hedge_stats['hedge_rate']:.0%} of calls • "
+                f"hedge wins: {hedge_stats['hedge_wins']}/{hedge_stats['hedges']}"
+            )
         
         # GPU Status Display with Hardware Name
-        from content_generator import SENTIMENT_ENABLED, GPU_HARDWARE
+        sentiment_status = content_generator.sentiment_model.get_status()
+        sentiment_state = sentiment_status['state']
+        gpu_hardware = sentiment_status['hardware']
         
-        if SENTIMENT_ENABLED and GPU_HARDWARE != "None" and GPU_HARDWARE != "CPU":
-            st.success(f"🚀 **GPU Acceleration:** Active ({GPU_HARDWARE})")
+        if sentiment_state in (STATE_NOT_LOADED, STATE_LOADING):
+            st.info("⏳ **Sentiment Model:** Loading in background...")
+            st.caption("Captions show sentiment as Pending until it is ready")
+        elif sentiment_state == STATE_READY and not gpu_hardware.startswith("CPU"):
+            st.success(f"🚀 **GPU Acceleration:** Active ({gpu_hardware})")
             
             # Show additional GPU info if available
             try:
@@ -191,8 +355,8 @@ def main():
                     st.info(f"💾 **VRAM:** {vram_gb:.1f} GB")
             except:
                 pass
-        elif GPU_HARDWARE == "CPU":
-            st.warning("⚠️ **GPU:** Not available (using CPU)")
+        elif sentiment_state == STATE_READY:
+            st.warning(f"⚠️ **GPU:** Not available (using {gpu_hardware})")
             st.caption("Models running on CPU - slower inference")
         else:
             st.error("⚠️ **Sentiment Analysis:** Disabled")
@@ -200,9 +364,14 @@ def main():
             st.caption("Install: `pip install torch transformers`")
         
         # Sentiment Analysis Status
-        if SENTIMENT_ENABLED:
+        if sentiment_state == STATE_READY:
             st.success("✅ **Sentiment Analysis:** Enabled")
-        else:
+            sentiment_stats = content_generator.get_sentiment_stats()
+            if sentiment_stats['batches']:
+                st.caption(f"⏱️ {sentiment_stats['avg_ms_per_caption']:.1f} ms per caption (batched)")
+            if sentiment_stats['cache'] is not None:
+                st.caption(f"🗂️ Sentiment cache hit rate: {sentiment_stats['cache']['memory']['hit_rate']:.0%}")
+        elif sentiment_state == STATE_DISABLED:
             st.warning("⚠️ **Sentiment Analysis:** Disabled")
         
         # RAG Settings
@@ -309,6 +478,14 @@ def main():
         help="Content will be optimized for the selected platforms"
     )
     
+    per_platform = False
+    if len(selected_platforms) > 1:
+        per_platform = st.checkbox(
+            "Generate separate captions for each platform",
+            value=True,
+            help="Runs one platform-specific generation per platform in parallel"
+        )
+    
     # --- Generation Options ---
     num_generations = st.slider(
         "Number of caption variations",
@@ -353,52 +530,72 @@ def main():
         
         with st.spinner(spinner_text):
             try:
-                # Use RAG pipeline if enabled
-                if use_rag and RAG_AVAILABLE:
-                    rag_pipeline = create_rag_pipeline(content_generator)
-                    generated_posts = rag_pipeline.generate_with_context(
-                        request,
-                        num_examples=num_context_examples,
-                        use_platform_filter=platform_filter
-                    )
-                else:
-                    # Standard generation
-                    generated_posts = content_generator.generate(request)
-                
-                # Display results
-                st.success(f"✅ Successfully generated {len(generated_posts)} caption(s)!")
-                st.subheader("✨ Your Generated Content")
+                rag_pipeline = create_rag_pipeline(
+                    content_generator,
+                    max_input_tokens=config.max_input_tokens,
+                    cache_dir=config.cache_dir,
+                    max_guideline_tokens=config.max_guideline_tokens
+                ) if use_rag and RAG_AVAILABLE else None
                 
-                for i, post in enumerate(generated_posts):
-                    st.markdown("---")
-                    st.markdown(f"### 📝 Post #{i+1}")
+                if per_platform:
+                    # Concurrent fan-out, results grouped per platform
+                    if rag_pipeline is not None:
+                        platform_results = rag_pipeline.generate_per_platform_with_context(
+                            request,
+                            num_examples=num_context_examples,
+                            use_platform_filter=platform_filter
+                        )
+                    else:
+                        platform_results = content_generator.generate_per_platform(request)
                     
-                    # Display caption with emojis
-                    st.write(f"**Caption:** {post.caption} {post.emojis}")
+                    total_posts = sum(len(r.posts) for r in platform_results.values())
+                    st.success(f"✅ Successfully generated {total_posts} caption(s) for {len(platform_results)} platforms!")
+                    st.subheader("✨ Your Generated Content")
                     
-                    # Display hashtags
-                    st.write(f"**Hashtags:** {' '.join(post.hashtags)}")
+                    tabs = st.tabs(list(platform_results.keys()))
+                    for tab, (platform, result) in zip(tabs, platform_results.items()):
+                        with tab:
+                            if not result.ok:
+                                st.error(f"❌ {platform}: {result.error}")
+                                continue
+                            for i, post in enumerate(result.posts):
+                                render_post(i, post, key_prefix=platform)
+                elif config.streaming_enabled:
+                    # Render each post as soon as it arrives
+                    status_placeholder = st.empty()
+                    st.subheader("✨ Your Generated Content")
+                    if rag_pipeline is not None:
+                        post_stream = rag_pipeline.generate_stream_with_context(
+                            request,
+                            num_examples=num_context_examples,
+                            use_platform_filter=platform_filter
+                        )
+                    else:
+                        post_stream = content_generator.generate_stream(request)
+                    
+                    generated_count = 0
+                    for i, post in enumerate(post_stream):
+                        render_post(i, post)
+                        generated_count += 1
+                    status_placeholder.success(f"✅ Successfully generated {generated_count} caption(s)!")
+                else:
+                    # Use RAG pipeline if enabled
+                    if rag_pipeline is not None:
+                        generated_posts = rag_pipeline.generate_with_context(
+                            request,
+                            num_examples=num_context_examples,
+                            use_platform_filter=platform_filter
+                        )
+                    else:
+                        # Standard generation
+                        generated_posts = content_generator.generate(request)
                     
-                    # Display GPU-accelerated sentiment analysis
-                    if post.sentiment:
-                        # Color-code sentiment based on label
-                        if "POSITIVE" in post.sentiment:
-                            st.success(f"🎯 **Sentiment:** {post.sentiment}")
-                        elif "NEGATIVE" in post.sentiment:
-                            st.error(f"🎯 **Sentiment:** {post.sentiment}")
-                        else:
-                            st.info(f"🎯 **Sentiment:** {post.sentiment}")
+                    # Display results
+                    st.success(f"✅ Successfully generated {len(generated_posts)} caption(s)!")
+                    st.subheader("✨ Your Generated Content")
                     
-                    # Copy button
-                    post_content = (
-                        f"Caption: {post.caption} {post.emojis}\n"
-                        f"Hashtags: {' '.join(post.hashtags)}"
-                    )
-                    copy_to_clipboard_button(
-                        post_content,
-                        button_text="📋 Copy This Post",
-                        key=f"copy_post_{i}"
-                    )
+                    for i, post in enumerate(generated_posts):
+                        render_post(i, post)
                 
             except ContentGenerationError as e:
                 st.error(f"❌ Content generation failed: {e}")
@@ -0,0 +1,142 @@
+"""
+Asynchronous Generation Engine
+
+Runs many ContentRequests concurrently over one shared, pooled
+GeminiContentGenerator with a bounded number of in-flight API calls.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Optional, Sequence
+
+from content_generator import (
+    GeminiContentGenerator,
+    ContentRequest,
+    GeneratedPost,
+    GenerationResult,
+    ContentGenerationError
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncGeminiContentGenerator:
+    """
+    Async counterpart of GeminiContentGenerator.
+
+    Each call runs the blocking generator on a worker thread, so every
+    request shares the generator's keep-alive connection pool while the
+    event loop bounds how many are in flight at once.
+    """
+
+    def __init__(self, generator: GeminiContentGenerator, max_concurrency: int = 8):
+        """
+        Initialize async engine.
+
+        Args:
+            generator: Shared GeminiContentGenerator instance
+            max_concurrency: Default limit on simultaneous API calls
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.generator = generator
+        self.max_concurrency = max_concurrency
+
+    async def generate(self, request: ContentRequest) -> List[GeneratedPost]:
+        """
+        Generate content for a single request without blocking the event loop.
+
+        Raises:
+            ContentGenerationError: If generation fails
+        """
+        return await asyncio.to_thread(self.generator.generate, request)
+
+    async def generate_many(
+        self,
+        requests: Sequence[ContentRequest],
+        max_concurrency: Optional[int] = None
+    ) -> List[GenerationResult]:
+        """
+        Generate content for many requests concurrently.
+
+        Args:
+            requests: Requests to generate
+            max_concurrency: Limit on simultaneous API calls (default: instance setting)
+
+        Returns:
+            One GenerationResult per request, in input order
+        """
+        stream = self.generate_as_completed(requests, max_concurrency)
+        try:
+            results = [result async for result in stream]
+        finally:
+            # Release workers now on cancellation rather than when the generator is collected
+            await stream.aclose()
+        return sorted(results, key=lambda r: r.index)
+
+    async def generate_as_completed(
+        self,
+        requests: Sequence[ContentRequest],
+        max_concurrency: Optional[int] = None
+    ) -> AsyncIterator[GenerationResult]:
+        """
+        Generate content for many requests, yielding results as they finish.
+
+        Args:
+            requests: Requests to generate
+            max_concurrency: Limit on simultaneous API calls (default: instance setting)
+
+        Yields:
+            GenerationResult objects in completion order
+        """
+        if not requests:
+            return
+
+        limit = min(max_concurrency or self.max_concurrency, len(requests))
+        semaphore = asyncio.Semaphore(limit)
+        loop = asyncio.get_running_loop()
+
+        logger.info(f"🚀 Generating {len(requests)} requests (concurrency: {limit})")
+
+        # Not a with-block: its exit would wait for in-flight calls on the event-loop thread
+        executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix="gemini-gen")
+
+        async def run(index: int, request: ContentRequest) -> GenerationResult:
+            async with semaphore:
+                try:
+                    posts = await loop.run_in_executor(executor, self.generator.generate, request)
+                    return GenerationResult(index=index, request=request, posts=posts)
+                except ContentGenerationError as e:
+                    return GenerationResult(index=index, request=request, error=e)
+                except Exception as e:
+                    logger.error(f"Unexpected error in batch item {index}: {type(e).__name__}: {str(e)}")
+                    return GenerationResult(
+                        index=index,
+                        request=request,
+                        error=ContentGenerationError(
+                            "An unexpected error occurred while generating content. Please try again."
+                        )
+                    )
+
+        tasks = [asyncio.ensure_future(run(i, r)) for i, r in enumerate(requests)]
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Never wait on the event-loop thread for blocking calls still in flight
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def generate_many_sync(
+        self,
+        requests: Sequence[ContentRequest],
+        max_concurrency: Optional[int] = None
+    ) -> List[GenerationResult]:
+        """
+        Blocking convenience wrapper around generate_many for scripts.
+
+        Must not be called from a running event loop.
+        """
+        return asyncio.run(self.generate_many(requests, max_concurrency))
@@ -0,0 +1,565 @@
+"""
+Microbenchmarks for the Generation and RAG Hot Paths
+
+Times prompt and payload construction, response parsing, sentiment
+analysis, RAG context formatting, vector retrieval and raw index search
+against recorded API responses and synthetic data. Nothing touches the
+network, and the results are written as JSON so runs can be compared
+across commits.
+
+Usage:
+    python benchmarks.py                                # Run all, print a table
+    python benchmarks.py --only prompt,parse --repeat 200
+    python benchmarks.py --output results.json          # Save machine-readable results
+    python benchmarks.py --compare base.json results.json
+"""
+
+import io
+import sys
+import json
+import time
+import random
+import hashlib
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DATA_DIR = Path(__file__).parent / "benchmark_data"
+RECORDED_RESPONSES = BENCHMARK_DATA_DIR / "gemini_responses.json"
+
+BENCHMARKS = ("prompt", "payload", "parse", "sentiment", "format_context", "retrieval", "search")
+DEFAULT_IMAGE_MB = (1, 5, 10, 20)
+DEFAULT_POST_COUNTS = (1, 3, 5, 10)
+DEFAULT_CORPUS_SIZES = (100, 1000, 10000)
+DEFAULT_SEARCH_SIZES = (1000, 10000, 100000)
+
+_VOCABULARY = (
+    "ai innovation launch product team growth customers marketing content strategy "
+    "engagement data insights automation cloud security community event webinar tips "
+    "announcement update feature release partnership success story behind scenes culture "
+    "hiring sustainability future trends analytics design mobile platform integration"
+).split()
+_PLATFORMS = ["LinkedIn", "Twitter/X", "Instagram", "Facebook"]
+_TONES = ["professional", "casual", "inspirational", "humorous"]
+
+
+def measure(
+    name: str,
+    fn: Callable[[], Any],
+    params: Optional[Dict[str, Any]] = None,
+    repeat: int = 50,
+    warmup: int = 2,
+    setup: Optional[Callable[[], None]] = None
+) -> Dict[str, Any]:
+    """
+    Time fn() repeatedly.
+
+    Args:
+        name: Benchmark name
+        fn: Function under test
+        params: Parameters recorded with the result
+        repeat: Timed iterations
+        warmup: Untimed iterations run first
+        setup: Called before every iteration, outside the timed region
+
+    Returns:
+        Result dict with mean/p50/p95/min latency in milliseconds
+    """
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    result = {
+        'name': name,
+        'params': params or {},
+        'repeat': repeat,
+        'mean_ms': statistics.fmean(samples),
+        'p50_ms': samples[len(samples) // 2],
+        'p95_ms': samples[min(int(len(samples) * 0.95), len(samples) - 1)],
+        'min_ms': samples[0]
+    }
+    logger.info(f"⏱️ {name} {result['params']}: p50 {result['p50_ms']:.3f} ms")
+    return result
+
+
+def skipped(name: str, reason: str) -> Dict[str, Any]:
+    """Result placeholder for a benchmark that could not run here"""
+    logger.warning(f"⚠️ Skipping {name}: {reason}")
+    return {'name': name, 'params': {}, 'skipped': reason}
+
+
+class HashingEmbeddings:
+    """
+    Deterministic bag-of-words embeddings so retrieval can be benchmarked
+    without downloading a model. Vectors are L2-normalized like MiniLM's.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _embed(self, text: str) -> List[float]:
+        import numpy as np
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in text.lower().split():
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.dim] += 1.0 if value & (1 << 63) else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    def __call__(self, text: str) -> List[float]:
+        return self.embed_query(text)
+
+
+def synthetic_examples(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate brand example posts with realistic caption lengths.
+
+    Args:
+        count: Number of examples
+        seed: Random seed
+
+    Returns:
+        Examples in the example_posts.json format
+    """
+    rng = random.Random(seed)
+    examples = []
+    for i in range(count):
+        words = rng.choices(_VOCABULARY, k=rng.randint(20, 45))
+        examples.append({
+            'id': f"synthetic-{i}",
+            'platform': rng.choice(_PLATFORMS),
+            'caption': " ".join(words).capitalize() + "!",
+            'hashtags': [w.capitalize() for w in rng.sample(_VOCABULARY, 4)],
+            'tone': rng.choice(_TONES),
+            'engagement': rng.choice(["high", "medium", "low"])
+        })
+    return examples
+
+
+def synthetic_image(target_mb: float, seed: int = 0) -> bytes:
+    """
+    Encode a noisy JPEG of roughly target_mb megabytes.
+
+    Noise defeats compression, so the file size tracks the pixel count
+    the way a detailed phone photo does.
+    """
+    from PIL import Image
+
+    # High-quality JPEG of noise is roughly 1.1 bytes per pixel
+    side = int((target_mb * 1e6 / 1.1) ** 0.5)
+    image = Image.frombytes("RGB", (side, side), random.Random(seed).randbytes(side * side * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=95)
+    return buffer.getvalue()
+
+
+def _make_generator(image_preprocessing: bool = True):
+    from content_generator import GeminiContentGenerator
+    from http_client import HTTPClientSettings, PooledHTTPClient
+    from image_processing import ImagePreprocessor, ImageProcessingSettings
+
+    return GeminiContentGenerator(
+        api_key="benchmark",
+        http_client=PooledHTTPClient(HTTPClientSettings(warmup=False)),
+        image_preprocessor=ImagePreprocessor(ImageProcessingSettings(enabled=image_preprocessing))
+    )
+
+
+def bench_prompt(repeat: int) -> List[Dict[str, Any]]:
+    """_build_prompt for single- and multi-platform requests"""
+    from content_generator import ContentRequest
+
+    generator = _make_generator()
+    results = []
+    for platforms in (["LinkedIn"], _PLATFORMS):
+        request = ContentRequest(
+            keywords="AI product launch, faster content creation",
+            post_type="Professional",
+            platforms=platforms,
+            num_generations=3
+        )
+        results.append(measure(
+            "build_prompt",
+            lambda: generator._build_prompt(request),
+            {'platforms': len(platforms)},
+            repeat=repeat * 20
+        ))
+    return results
+
+
+def bench_payload(repeat: int, image_sizes=DEFAULT_IMAGE_MB) -> List[Dict[str, Any]]:
+    """_build_payload with images, raw and with (cold and cached) pre-processing"""
+    from content_generator import ContentRequest
+
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return [skipped("build_payload", "Pillow not installed")]
+
+    results = []
+    raw_generator = _make_generator(image_preprocessing=False)
+    generator = _make_generator(image_preprocessing=True)
+    iterations = max(repeat // 10, 3)
+
+    for target_mb in image_sizes:
+        data = synthetic_image(target_mb)
+        request = ContentRequest(
+            keywords="Team offsite photo",
+            post_type="Casual",
+            platforms=["Instagram"],
+            image_data=data,
+            image_mime_type="image/jpeg"
+        )
+        prompt = generator._build_prompt(request)
+        params = {'image_mb': round(len(data) / 1e6, 1)}
+
+        results.append(measure(
+            "build_payload",
+            lambda: raw_generator._build_payload(prompt, request),
+            dict(params, preprocess="off"),
+            repeat=iterations,
+            warmup=1
+        ))
+        results.append(measure(
+            "build_payload",
+            lambda: generator._build_payload(prompt, request),
+            dict(params, preprocess="cold"),
+            repeat=iterations,
+            warmup=1,
+            setup=generator.image_preprocessor._cache.clear
+        ))
+        results.append(measure(
+            "build_payload",
+            lambda: generator._build_payload(prompt, request),
+            dict(params, preprocess="cached"),
+            repeat=iterations
+        ))
+    return results
+
+
+def load_recorded_responses() -> Dict[int, Dict[str, Any]]:
+    """Recorded generateContent bodies keyed by number of posts"""
+    with open(RECORDED_RESPONSES, "r", encoding="utf-8") as f:
+        return {int(count): body for count, body in json.load(f).items()}
+
+
+def bench_parse(
+    repeat: int,
+    post_counts=DEFAULT_POST_COUNTS,
+    load_timeout: float = 300.0
+) -> List[Dict[str, Any]]:
+    """_parse_response over recorded responses (sentiment labels served from cache)"""
+    generator = _make_generator()
+    # Settle the sentiment model first so every iteration takes the same path
+    generator.sentiment_model.get(wait=True, timeout=load_timeout)
+    responses = load_recorded_responses()
+    return [
+        measure(
+            "parse_response",
+            lambda body=responses[count]: generator._parse_response(body),
+            {'posts': count},
+            repeat=repeat * 4
+        )
+        for count in post_counts
+        if count in responses
+    ]
+
+
+def bench_sentiment(repeat: int, load_timeout: float = 300.0) -> List[Dict[str, Any]]:
+    """_analyze_sentiment on unseen (model inference) and repeated (cached) captions"""
+    from sentiment_analyzer import get_sentiment_model
+
+    generator = _make_generator()
+    if generator.sentiment_model.get(wait=True, timeout=load_timeout) is None:
+        return [skipped("analyze_sentiment", "sentiment model unavailable")]
+
+    captions = [ex['caption'] for ex in synthetic_examples(repeat + 4, seed=1)]
+    unseen = iter(captions)
+    status = get_sentiment_model().get_status()
+    params = {'backend': status['backend'], 'hardware': status['hardware']}
+    return [
+        measure(
+            "analyze_sentiment",
+            lambda: generator._analyze_sentiment(next(unseen)),
+            dict(params, cache="miss"),
+            repeat=repeat
+        ),
+        measure(
+            "analyze_sentiment",
+            lambda: generator._analyze_sentiment(captions[0]),
+            dict(params, cache="hit"),
+            repeat=repeat * 4
+        )
+    ]
+
+
+def bench_format_context(repeat: int) -> List[Dict[str, Any]]:
+    """RAGContentPipeline._format_context for typical example counts"""
+    from rag_pipeline import RAGContentPipeline
+
+    # Formatting only; skip vector store and model loading
+    pipeline = RAGContentPipeline.__new__(RAGContentPipeline)
+    examples = [
+        dict(ex, similarity_score=1 - i * 0.05)
+        for i, ex in enumerate(synthetic_examples(10, seed=2))
+    ]
+    return [
+        measure(
+            "format_context",
+            lambda n=n: pipeline._format_context(examples[:n]),
+            {'examples': n},
+            repeat=repeat * 20
+        )
+        for n in (1, 3, 10)
+    ]
+
+
+def bench_retrieval(repeat: int, corpus_sizes=DEFAULT_CORPUS_SIZES) -> List[Dict[str, Any]]:
+    """BrandVectorStore.retrieve_similar and retrieve_similar_batch over synthetic corpora of several sizes"""
+    from vector_store import BrandVectorStore
+
+    results = []
+    queries = [" ".join(random.Random(i).sample(_VOCABULARY, 4)) for i in range(32)]
+    for size in corpus_sizes:
+        with tempfile.TemporaryDirectory() as content_dir:
+            examples = synthetic_examples(size)
+            # A rare platform (1% of the corpus) shows how filtered latency scales
+            for ex in examples[::100]:
+                ex['platform'] = "Pinterest"
+            with open(Path(content_dir) / "example_posts.json", "w", encoding="utf-8") as f:
+                json.dump(examples, f)
+
+            # Keep the persisted index inside the temporary directory so nothing is left behind
+            store = BrandVectorStore(
+                content_dir,
+                embeddings=HashingEmbeddings(),
+                index_dir=str(Path(content_dir) / "index")
+            )
+            start = time.perf_counter()
+            if not store.load_brand_content():
+                results.append(skipped("retrieve_similar", "vector store could not be built"))
+                break
+            load_ms = (time.perf_counter() - start) * 1000
+
+            for platform_filter in (None, "LinkedIn", "Pinterest"):
+                counter = iter(range(10 ** 9))
+                result = measure(
+                    "retrieve_similar",
+                    lambda: store.retrieve_similar(
+                        queries[next(counter) % len(queries)],
+                        k=3,
+                        filter_platform=platform_filter
+                    ),
+                    {'corpus': size, 'filter': platform_filter or "none"},
+                    repeat=repeat
+                )
+                result['load_ms'] = load_ms
+                results.append(result)
+
+            # One call for a 4-platform fan-out vs four retrieve_similar calls
+            filters = ["LinkedIn", "Twitter/X", "Instagram", "Facebook"]
+            results.append(measure(
+                "retrieve_similar_batch",
+                lambda: store.retrieve_similar_batch(queries[:4], k=3, filters=filters),
+                {'corpus': size, 'queries': len(filters)},
+                repeat=repeat
+            ))
+    return results
+
+
+def bench_search(repeat: int, corpus_sizes=DEFAULT_SEARCH_SIZES, dim: int = 384) -> List[Dict[str, Any]]:
+    """Top-3 search: InnerProductIndex (NumPy and FAISS backends) vs the LangChain FAISS path"""
+    import numpy as np
+    from vector_index import FAISS_AVAILABLE, InnerProductIndex
+
+    results = []
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((32, dim)).astype(np.float32)
+    for size in corpus_sizes:
+        vectors = rng.standard_normal((size, dim)).astype(np.float32)
+        payloads = [{'id': f"post-{i}", 'caption': f"caption {i}"} for i in range(size)]
+        counter = iter(range(10 ** 9))
+
+        def next_query():
+            return queries[next(counter) % len(queries)]
+
+        engines = {'numpy': InnerProductIndex(vectors, payloads, faiss_threshold=size + 1)}
+        if FAISS_AVAILABLE:
+            engines['faiss_ip'] = InnerProductIndex(vectors, payloads, faiss_threshold=0)
+        else:
+            results.append(skipped("index_search", "faiss not installed"))
+        for backend, index in engines.items():
+            results.append(measure(
+                "index_search",
+                lambda: [dict(p, similarity_score=s) for p, s in index.search(next_query(), 3)],
+                {'corpus': size, 'backend': backend},
+                repeat=repeat
+            ))
+
+        try:
+            from langchain.vectorstores import FAISS
+        except ImportError:
+            results.append(skipped("index_search", "langchain not installed"))
+            continue
+        store = FAISS.from_embeddings(
+            text_embeddings=[(p['caption'], v) for p, v in zip(payloads, vectors.tolist())],
+            embedding=HashingEmbeddings(dim),
+            metadatas=payloads
+        )
+        # The pre-InnerProductIndex path: L2 search plus per-hit Document unpacking
+        results.append(measure(
+            "index_search",
+            lambda: [
+                dict(doc.metadata, content=doc.page_content, similarity_score=float(1 - score))
+                for doc, score in store.similarity_search_with_score_by_vector(next_query().tolist(), k=3)
+            ],
+            {'corpus': size, 'backend': "langchain_faiss"},
+            repeat=repeat
+        ))
+    return results
+
+
+def run_benchmarks(selected=BENCHMARKS, repeat: int = 50) -> Dict[str, Any]:
+    """
+    Run the selected benchmarks.
+
+    Args:
+        selected: Benchmark names from BENCHMARKS
+        repeat: Base iteration count (cheap benchmarks scale it up)
+
+    Returns:
+        Results document with environment metadata
+    """
+    runners = {
+        'prompt': bench_prompt,
+        'payload': bench_payload,
+        'parse': bench_parse,
+        'sentiment': bench_sentiment,
+        'format_context': bench_format_context,
+        'retrieval': bench_retrieval,
+        'search': bench_search
+    }
+    results = []
+    for name in selected:
+        try:
+            results.extend(runners[name](repeat))
+        except ImportError as e:
+            results.append(skipped(name, f"missing dependency: {e}"))
+    return {'meta': _environment(), 'results': results}
+
+
+def _environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent
+        ).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine()
+    }
+
+
+def _result_key(result: Dict[str, Any]) -> str:
+    return result['name'] + json.dumps(result['params'], sort_keys=True)
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Pair results from two runs and compute p50 changes.
+
+    Returns:
+        One row per benchmark present and not skipped in both runs
+    """
+    base_by_key = {_result_key(r): r for r in base['results'] if 'skipped' not in r}
+    rows = []
+    for result in new['results']:
+        old = base_by_key.get(_result_key(result))
+        if old is None or 'skipped' in result:
+            continue
+        rows.append({
+            'name': result['name'],
+            'params': result['params'],
+            'base_p50_ms': old['p50_ms'],
+            'new_p50_ms': result['p50_ms'],
+            'change': result['p50_ms'] / old['p50_ms'] - 1 if old['p50_ms'] else 0.0
+        })
+    return rows
+
+
+def _print_table(results: List[Dict[str, Any]]) -> None:
+    for r in results:
+        params = " ".join(f"{k}={v}" for k, v in r['params'].items())
+        if 'skipped' in r:
+            print(f"{r['name']:<20} {params:<40} skipped: {r['skipped']}")
+        else:
+            print(f"{r['name']:<20} {params:<40} p50 {r['p50_ms']:>10.3f} ms  p95 {r['p95_ms']:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generation and RAG microbenchmarks")
+    parser.add_argument("--only", help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=50, help="Base iteration count")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two result files")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+    sys.path.insert(0, str(Path(__file__).parent))
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            base_run = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            new_run = json.load(f)
+        for row in compare(base_run, new_run):
+            params = " ".join(f"{k}={v}" for k, v in row['params'].items())
+            print(
+                f"{row['name']:<20} {params:<40} {row['base_p50_ms']:>10.3f} → "
+                f"{row['new_p50_ms']:>10.3f} ms ({row['change']:+.1%})"
+            )
+        sys.exit(0)
+
+    selected = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    report = run_benchmarks(selected, args.repeat)
+    _print_table(report['results'])
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
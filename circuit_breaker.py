@@ -0,0 +1,240 @@
+"""
+Circuit Breaker for the Gemini API
+
+Tracks the rolling error rate and latency of API calls. When the service
+is degraded the breaker opens and calls fail fast instead of each user
+waiting out the full timeout; after a cool-down a limited number of probe
+requests are let through (half-open) and their outcome decides whether the
+circuit closes again.
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# Circuit states
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the API while the circuit is open"""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"Circuit open; next probe in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+@dataclass(frozen=True)
+class CircuitBreakerSettings:
+    """
+    Circuit breaker thresholds.
+
+    Attributes:
+        window_size: Number of recent calls in the rolling window
+        min_calls: Calls required in the window before the breaker can trip
+        failure_rate_threshold: Fraction of failed calls that opens the circuit
+        slow_call_seconds: Calls (including their retries) slower than this count as slow
+        slow_call_rate_threshold: Fraction of slow calls that opens the circuit
+        open_seconds: Cool-down before probing a tripped circuit
+        half_open_probes: Probe requests allowed (and required to succeed) when half-open
+    """
+
+    window_size: int = 20
+    min_calls: int = 5
+    failure_rate_threshold: float = 0.5
+    slow_call_seconds: float = 20.0
+    slow_call_rate_threshold: float = 0.8
+    open_seconds: float = 30.0
+    half_open_probes: int = 1
+
+
+class CircuitBreaker:
+    """
+    Thread-safe closed/open/half-open circuit breaker.
+
+    Example:
+        admission = breaker.before_call()  # raises CircuitOpenError while open
+        try:
+            response = send()
+        except ConnectionError:
+            breaker.record(False, elapsed, admission)
+            raise
+        breaker.record(response.ok, elapsed, admission)
+    """
+
+    def __init__(
+        self,
+        settings: Optional[CircuitBreakerSettings] = None,
+        on_state_change: Optional[Callable[[str, str, Dict[str, Any]], None]] = None
+    ):
+        """
+        Initialize circuit breaker.
+
+        Args:
+            settings: Thresholds (defaults if None)
+            on_state_change: Metrics hook called as (old_state, new_state, stats)
+        """
+        self.settings = settings or CircuitBreakerSettings()
+        self.on_state_change = on_state_change
+        self._lock = threading.Lock()
+        # (succeeded, slow) per call, newest last
+        self._window = deque(maxlen=self.settings.window_size)
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        # Bumped on every transition; outcomes of calls admitted earlier are ignored
+        self._generation = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        return self.get_stats()['state']
+
+    def before_call(self) -> int:
+        """
+        Admit or reject an API call.
+
+        Returns:
+            Admission token to pass to record()
+
+        Raises:
+            CircuitOpenError: If the circuit is open or all probe slots are taken
+        """
+        with self._lock:
+            transition = self._maybe_half_open()
+            stats = self._stats_locked() if transition else None
+            admitted = self._state == STATE_CLOSED
+            if self._state == STATE_HALF_OPEN and self._probes_in_flight < self.settings.half_open_probes:
+                self._probes_in_flight += 1
+                admitted = True
+                logger.info("🩺 Circuit half-open, sending probe request")
+            if not admitted:
+                self.rejected += 1
+                retry_in = max(self._opened_at + self.settings.open_seconds - time.monotonic(), 0.0)
+            generation = self._generation
+
+        if transition:
+            self._notify(*transition, stats)
+        if not admitted:
+            raise CircuitOpenError(retry_in)
+        return generation
+
+    def record(self, success: bool, latency_s: float, admission: int) -> None:
+        """
+        Record the outcome of an admitted call.
+
+        Args:
+            success: False for transport errors, timeouts, 429 and 5xx responses
+            latency_s: Call duration in seconds
+            admission: Token returned by before_call() for this call
+        """
+        transition = None
+        with self._lock:
+            if admission != self._generation:
+                # Admitted under an earlier state, e.g. a slow call finishing after
+                # the trip; it must not count as a probe or skew the new window
+                return
+            if self._state == STATE_HALF_OPEN:
+                self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+                if not success:
+                    transition = self._transition(STATE_OPEN)
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.settings.half_open_probes:
+                        self._window.clear()
+                        transition = self._transition(STATE_CLOSED)
+            elif self._state == STATE_CLOSED:
+                self._window.append((success, latency_s >= self.settings.slow_call_seconds))
+                if self._should_trip():
+                    transition = self._transition(STATE_OPEN)
+            stats = self._stats_locked() if transition else None
+
+        if transition:
+            self._notify(*transition, stats)
+
+    def reset(self) -> None:
+        """Force the circuit closed and forget recent outcomes"""
+        with self._lock:
+            self._window.clear()
+            transition = self._transition(STATE_CLOSED) if self._state != STATE_CLOSED else None
+            stats = self._stats_locked()
+        if transition:
+            self._notify(*transition, stats)
+
+    def _should_trip(self) -> bool:
+        calls = len(self._window)
+        if calls < self.settings.min_calls:
+            return False
+        failures = sum(1 for ok, _ in self._window if not ok)
+        slow = sum(1 for _, is_slow in self._window if is_slow)
+        return (
+            failures / calls >= self.settings.failure_rate_threshold
+            or slow / calls >= self.settings.slow_call_rate_threshold
+        )
+
+    def _maybe_half_open(self):
+        """Move an open circuit to half-open once the cool-down has elapsed"""
+        if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.settings.open_seconds:
+            return self._transition(STATE_HALF_OPEN)
+        return None
+
+    def _transition(self, new_state: str):
+        old_state = self._state
+        self._state = new_state
+        self._generation += 1
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if new_state == STATE_OPEN:
+            self._opened_at = time.monotonic()
+            self.times_opened += 1
+            logger.warning(
+                f"🚨 Gemini API circuit opened; failing fast for {self.settings.open_seconds:.0f}s"
+            )
+        elif new_state == STATE_HALF_OPEN:
+            logger.info("🔌 Gemini API circuit half-open; probing for recovery")
+        elif new_state == STATE_CLOSED:
+            logger.info("✅ Gemini API circuit closed; service recovered")
+        return old_state, new_state
+
+    def _notify(self, old_state: str, new_state: str, stats: Dict[str, Any]) -> None:
+        if self.on_state_change is None:
+            return
+        try:
+            self.on_state_change(old_state, new_state, stats)
+        except Exception as e:
+            logger.warning(f"⚠️ Circuit breaker metrics hook failed: {e}")
+
+    def _stats_locked(self) -> Dict[str, Any]:
+        calls = len(self._window)
+        failures = sum(1 for ok, _ in self._window if not ok)
+        slow = sum(1 for _, is_slow in self._window if is_slow)
+        retry_in = 0.0
+        if self._state == STATE_OPEN:
+            retry_in = max(self._opened_at + self.settings.open_seconds - time.monotonic(), 0.0)
+        return {
+            'state': self._state,
+            'window_calls': calls,
+            'failure_rate': failures / calls if calls else 0.0,
+            'slow_rate': slow / calls if calls else 0.0,
+            'rejected': self.rejected,
+            'times_opened': self.times_opened,
+            'retry_in': retry_in
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get current state and rolling window rates"""
+        with self._lock:
+            transition = self._maybe_half_open()
+            stats = self._stats_locked()
+        if transition:
+            self._notify(*transition, stats)
+        return stats
@@ -22,17 +22,81 @@ class Config:
         gemini_api_key: Google Gemini API key
         environment: Current environment (development/production)
         cache_enabled: Whether to enable response caching
+        cache_ttl_seconds: Lifetime of cached responses in seconds (0 for no expiry)
+        cache_max_mb: Size cap of the in-memory response cache in megabytes
+        cache_dir: Directory for the persistent response cache (empty to disable)
         max_generations: Maximum number of captions to generate
         temperature: Model temperature for generation (0-1)
         debug: Enable debug mode
+        streaming_enabled: Render posts progressively via streamGenerateContent
+        image_preprocessing: Downscale and re-encode uploads before sending
+        image_max_pixels: Maximum width * height of images sent to the API
+        image_format: Re-encoding format (JPEG or WEBP)
+        image_quality: Re-encoding quality (1-100)
+        sentiment_batch_size: Captions per sentiment model forward pass
+        sentiment_warmup: Load the sentiment model in the background at startup
+        sentiment_backend: Sentiment inference backend (pytorch or onnx)
+        sentiment_cache_mb: Size cap of the in-memory sentiment label cache in megabytes
+        http_pool_maxsize: Maximum pooled connections to the Gemini API
+        http_keepalive: Keep idle API connections open between requests
+        http2: Use HTTP/2 multiplexing (requires httpx[http2])
+        http_warmup: Open an API connection at startup
+        connect_timeout: Seconds allowed to connect to the API
+        read_timeout: Seconds allowed to wait for the API response
+        retry_max_attempts: Total API attempts for transient failures
+        retry_base_delay: Exponential backoff base in seconds
+        retry_max_delay: Maximum single backoff in seconds
+        request_deadline: Overall seconds budget for an API call including retries
+        circuit_breaker_enabled: Fail fast while the Gemini API is degraded
+        circuit_failure_rate: Rolling error rate that opens the circuit (0-1)
+        circuit_slow_call_seconds: API calls (including retries) slower than this count as slow
+        circuit_open_seconds: Cool-down before probing an open circuit
+        hedging_enabled: Send a backup request when a call is unusually slow
+        hedge_percentile: Recent-latency percentile that triggers a hedge (0-1)
+        hedge_max_rate: Maximum fraction of calls that may be hedged (0-1)
+        max_input_tokens: Input-token budget for prompt, RAG context and image
+        max_guideline_tokens: Share of the input budget for brand voice guideline sections
+        gemini_base_url: Gemini API base URL (point at mock_gemini_server.py for offline runs)
     """
     
     gemini_api_key: str
     environment: str = "development"
     cache_enabled: bool = True
+    cache_ttl_seconds: int = 3600
+    cache_max_mb: int = 50
+    cache_dir: str = ""
     max_generations: int = 5
     temperature: float = 0.7
     debug: bool = False
+    streaming_enabled: bool = True
+    image_preprocessing: bool = True
+    image_max_pixels: int = 2_000_000
+    image_format: str = "JPEG"
+    image_quality: int = 85
+    sentiment_batch_size: int = 8
+    sentiment_warmup: bool = True
+    sentiment_backend: str = "pytorch"
+    sentiment_cache_mb: int = 4
+    http_pool_maxsize: int = 16
+    http_keepalive: bool = True
+    http2: bool = False
+    http_warmup: bool = True
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    retry_max_attempts: int = 3
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 8.0
+    request_deadline: float = 45.0
+    circuit_breaker_enabled: bool = True
+    circuit_failure_rate: float = 0.5
+    circuit_slow_call_seconds: float = 20.0
+    circuit_open_seconds: float = 30.0
+    hedging_enabled: bool = False
+    hedge_percentile: float = 0.95
+    hedge_max_rate: float = 0.1
+    max_input_tokens: int = 4000
+    max_guideline_tokens: int = 300
+    gemini_base_url: str = "https://generativelanguage.googleapis.com"
     
     @classmethod
     def from_env(cls) -> "Config":
@@ -43,7 +107,39 @@ class Config:
             GEMINI_API_KEY: Required. Google Gemini API key
             ENVIRONMENT: Optional. Deployment environment (default: development)
             CACHE_ENABLED: Optional. Enable caching (default: true)
+            CACHE_TTL_SECONDS: Optional. Cached response lifetime (default: 3600)
+            CACHE_MAX_MB: Optional. In-memory cache size cap (default: 50)
+            CACHE_DIR: Optional. Persistent cache directory (default: disabled)
             DEBUG: Optional. Enable debug mode (default: false)
+            STREAMING_ENABLED: Optional. Stream posts as they generate (default: true)
+            IMAGE_PREPROCESSING: Optional. Downscale uploads (default: true)
+            IMAGE_MAX_PIXELS: Optional. Max image pixels sent (default: 2000000)
+            IMAGE_FORMAT: Optional. JPEG or WEBP (default: JPEG)
+            IMAGE_QUALITY: Optional. Re-encoding quality (default: 85)
+            SENTIMENT_BATCH_SIZE: Optional. Captions per sentiment batch (default: 8)
+            SENTIMENT_WARMUP: Optional. Warm sentiment model at startup (default: true)
+            SENTIMENT_BACKEND: Optional. pytorch or onnx (int8, CPU; run `python onnx_sentiment.py --export` first) (default: pytorch)
+            SENTIMENT_CACHE_MB: Optional. Sentiment label cache size (default: 4)
+            HTTP_POOL_MAXSIZE: Optional. Pooled API connections (default: 16)
+            HTTP_KEEPALIVE: Optional. Keep API connections alive (default: true)
+            HTTP2: Optional. Enable HTTP/2 multiplexing (default: false)
+            HTTP_WARMUP: Optional. Warm up the API connection (default: true)
+            CONNECT_TIMEOUT: Optional. API connect timeout in seconds (default: 5)
+            READ_TIMEOUT: Optional. API read timeout in seconds (default: 30)
+            RETRY_MAX_ATTEMPTS: Optional. API attempts on transient errors (default: 3)
+            RETRY_BASE_DELAY: Optional. Backoff base in seconds (default: 0.5)
+            RETRY_MAX_DELAY: Optional. Maximum backoff in seconds (default: 8)
+            REQUEST_DEADLINE: Optional. Total API budget in seconds (default: 45)
+            CIRCUIT_BREAKER_ENABLED: Optional. Fail fast when the API is degraded (default: true)
+            CIRCUIT_FAILURE_RATE: Optional. Error rate that opens the circuit (default: 0.5)
+            CIRCUIT_SLOW_CALL_SECONDS: Optional. Slow attempt threshold (default: 20)
+            CIRCUIT_OPEN_SECONDS: Optional. Seconds before probing recovery (default: 30)
+            HEDGING_ENABLED: Optional. Hedge slow API calls (default: false)
+            HEDGE_PERCENTILE: Optional. Latency percentile that triggers a hedge (default: 0.95)
+            HEDGE_MAX_RATE: Optional. Maximum fraction of hedged calls (default: 0.1)
+            MAX_INPUT_TOKENS: Optional. Input-token budget per request (default: 4000)
+            MAX_GUIDELINE_TOKENS: Optional. Tokens for brand voice guideline sections (default: 300)
+            GEMINI_BASE_URL: Optional. API base URL (default: https://generativelanguage.googleapis.com)
         
         Returns:
             Config: Configuration object
@@ -63,9 +159,41 @@ class Config:
             gemini_api_key=api_key,
             environment=os.getenv("ENVIRONMENT", "development"),
             cache_enabled=os.getenv("CACHE_ENABLED", "true").lower() == "true",
+            cache_ttl_seconds=int(os.getenv("CACHE_TTL_SECONDS", "3600")),
+            cache_max_mb=int(os.getenv("CACHE_MAX_MB", "50")),
+            cache_dir=os.getenv("CACHE_DIR", ""),
             max_generations=int(os.getenv("MAX_GENERATIONS", "5")),
             temperature=float(os.getenv("TEMPERATURE", "0.7")),
-            debug=os.getenv("DEBUG", "false").lower() == "true"
+            debug=os.getenv("DEBUG", "false").lower() == "true",
+            streaming_enabled=os.getenv("STREAMING_ENABLED", "true").lower() == "true",
+            image_preprocessing=os.getenv("IMAGE_PREPROCESSING", "true").lower() == "true",
+            image_max_pixels=int(os.getenv("IMAGE_MAX_PIXELS", "2000000")),
+            image_format=os.getenv("IMAGE_FORMAT", "JPEG").upper(),
+            image_quality=int(os.getenv("IMAGE_QUALITY", "85")),
+            sentiment_batch_size=int(os.getenv("SENTIMENT_BATCH_SIZE", "8")),
+            sentiment_warmup=os.getenv("SENTIMENT_WARMUP", "true").lower() == "true",
+            sentiment_backend=os.getenv("SENTIMENT_BACKEND", "pytorch").lower(),
+            sentiment_cache_mb=int(os.getenv("SENTIMENT_CACHE_MB", "4")),
+            http_pool_maxsize=int(os.getenv("HTTP_POOL_MAXSIZE", "16")),
+            http_keepalive=os.getenv("HTTP_KEEPALIVE", "true").lower() == "true",
+            http2=os.getenv("HTTP2", "false").lower() == "true",
+            http_warmup=os.getenv("HTTP_WARMUP", "true").lower() == "true",
+            connect_timeout=float(os.getenv("CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.getenv("READ_TIMEOUT", "30")),
+            retry_max_attempts=int(os.getenv("RETRY_MAX_ATTEMPTS", "3")),
+            retry_base_delay=float(os.getenv("RETRY_BASE_DELAY", "0.5")),
+            retry_max_delay=float(os.getenv("RETRY_MAX_DELAY", "8")),
+            request_deadline=float(os.getenv("REQUEST_DEADLINE", "45")),
+            circuit_breaker_enabled=os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true",
+            circuit_failure_rate=float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5")),
+            circuit_slow_call_seconds=float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "20")),
+            circuit_open_seconds=float(os.getenv("CIRCUIT_OPEN_SECONDS", "30")),
+            hedging_enabled=os.getenv("HEDGING_ENABLED", "false").lower() == "true",
+            hedge_percentile=float(os.getenv("HEDGE_PERCENTILE", "0.95")),
+            hedge_max_rate=float(os.getenv("HEDGE_MAX_RATE", "0.1")),
+            max_input_tokens=int(os.getenv("MAX_INPUT_TOKENS", "4000")),
+            max_guideline_tokens=int(os.getenv("MAX_GUIDELINE_TOKENS", "300")),
+            gemini_base_url=os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com")
         )
     
     def validate(self) -> None:
@@ -83,3 +211,51 @@ class Config:
         
         if self.max_generations < 1 or self.max_generations > 10:
             raise ValueError("Max generations must be between 1 and 10")
+        
+        if self.cache_ttl_seconds < 0 or self.cache_max_mb < 1:
+            raise ValueError("Cache TTL must be non-negative and cache size at least 1 MB")
+        
+        if self.sentiment_backend not in ("pytorch", "onnx"):
+            raise ValueError("Sentiment backend must be pytorch or onnx")
+        
+        if self.sentiment_cache_mb < 1:
+            raise ValueError("Sentiment cache size must be at least 1 MB")
+        
+        if self.sentiment_batch_size < 1:
+            raise ValueError("Sentiment batch size must be at least 1")
+        
+        if self.image_format not in ("JPEG", "WEBP"):
+            raise ValueError("Image format must be JPEG or WEBP")
+        
+        if self.image_quality < 1 or self.image_quality > 100 or self.image_max_pixels < 1:
+            raise ValueError("Image quality must be between 1 and 100 and max pixels positive")
+        
+        if self.http_pool_maxsize < 1:
+            raise ValueError("HTTP pool size must be at least 1")
+        
+        if self.connect_timeout <= 0 or self.read_timeout <= 0:
+            raise ValueError("Timeouts must be positive")
+        
+        if self.retry_max_attempts < 1:
+            raise ValueError("Retry attempts must be at least 1")
+        
+        if self.request_deadline <= 0:
+            raise ValueError("Request deadline must be positive")
+        
+        if not 0 < self.circuit_failure_rate <= 1:
+            raise ValueError("Circuit failure rate must be between 0 and 1")
+        
+        if self.circuit_slow_call_seconds <= 0 or self.circuit_open_seconds <= 0:
+            raise ValueError("Circuit breaker durations must be positive")
+        
+        if not 0 < self.hedge_percentile < 1 or not 0 <= self.hedge_max_rate <= 1:
+            raise ValueError("Hedge percentile must be between 0 and 1 and hedge rate between 0 and 1")
+        
+        if self.max_input_tokens < 500:
+            raise ValueError("Max input tokens must be at least 500")
+        
+        if not 0 <= self.max_guideline_tokens < self.max_input_tokens:
+            raise ValueError("Max guideline tokens must be between 0 and max input tokens")
+        
+        if not self.gemini_base_url.startswith(("http://", "https://")):
+            raise ValueError("Gemini base URL must start with http:// or https://")
@@ -2,76 +2,40 @@
 Content Generation Module
 Handles AI-powered social media content generation with integrated 
 sentiment analysis for tone validation using GPU acceleration.
+The sentiment model is loaded lazily (see sentiment_analyzer.py).
 """
 
 import requests
-import json
-import base64
+import time
 import logging
-import streamlit as st
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterator, Optional
+from dataclasses import dataclass, field, replace
+from concurrent.futures import ThreadPoolExecutor
 
-logger = logging.getLogger(__name__)
-
-# --- GPU-Accelerated Sentiment Analysis Setup ---
-# This function ensures the GPU stays 'warm' and the page loads fast
-@st.cache_resource
-def initialize_gpu_pipeline():
-    """
-    Load sentiment analysis model onto GPU with caching.
-    This decorator ensures the model is loaded ONCE and kept in GPU VRAM
-    for ultra-fast inference across all user sessions.
-    
-    Returns:
-        tuple: (analyzer_pipeline, is_enabled, gpu_hardware_name)
-    """
-    try:
-        from transformers import pipeline
-        import torch
-        
-        # device=0 specifically targets your RTX card
-        device = 0 if torch.cuda.is_available() else -1
-        
-        logger.info(f"🚀 Initializing GPU pipeline...")
-        logger.info(f"CUDA Available: {torch.cuda.is_available()}")
-        
-        if device == 0:
-            gpu_name = torch.cuda.get_device_name(0)
-            logger.info(f"🎯 Targeting GPU: {gpu_name}")
-        else:
-            gpu_name = "CPU"
-            logger.warning("⚠️ No GPU detected, using CPU")
-        
-        # Load model with explicit device assignment
-        analyzer = pipeline(
-            "sentiment-analysis",
-            device=device,
-            model="distilbert-base-uncased-finetuned-sst-2-english"  # Explicit model for consistency
-        )
-        
-        logger.info(f"✅ Sentiment analyzer loaded successfully on {gpu_name}")
-        logger.info(f"🎯 Model will remain in {'VRAM' if device == 0 else 'RAM'} for fast inference")
-        
-        return analyzer, True, gpu_name
-        
-    except ImportError as e:
-        logger.warning(f"⚠️ Sentiment analysis disabled: {e}")
-        logger.warning("💡 Install 'transformers' and 'torch' to enable GPU acceleration")
-        logger.warning("💡 Run: pip install torch transformers")
-        return None, False, "None"
-    except Exception as e:
-        logger.error(f"❌ Failed to load sentiment analyzer: {e}")
-        return None, False, "None"
-
-# Execute immediately on web page load - Initialize GPU model at module load time
-SENTIMENT_ANALYZER, SENTIMENT_ENABLED, GPU_HARDWARE = initialize_gpu_pipeline()
-
-if SENTIMENT_ENABLED:
-    logger.info(f"🔥 GPU-accelerated sentiment analysis is READY on {GPU_HARDWARE}!")
-else:
-    logger.info("ℹ️ Sentiment analysis is disabled - check environment and dependencies")
+from image_processing import ImagePreprocessor, ProcessedImage
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from hedging import Hedger
+from http_client import PooledHTTPClient, GEMINI_BASE_URL, get_shared_http_client
+from response_cache import GenerationCache, make_request_key
+from response_parser import (
+    BLOCKED_FINISH_REASONS,
+    IncrementalJSONArrayParser,
+    ParseResult,
+    extract_candidate_text,
+    get_finish_reason,
+    iter_sse_data,
+    loads,
+    parse_generation_response
+)
+from retry_policy import RetryPolicy, RetryStats, call_with_retry
+from token_budget import estimate_image_tokens, estimate_tokens
+from singleflight import SingleFlight
+from sentiment_analyzer import SENTIMENT_PENDING, SentimentCache, get_sentiment_model
 
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -93,26 +57,216 @@ class GeneratedPost:
 class ContentGenerationError(Exception):
     pass
 
+@dataclass
+class GenerationResult:
+    """Outcome of one request in a batch; failures never abort the batch"""
+    index: int
+    request: ContentRequest
+    posts: List[GeneratedPost] = field(default_factory=list)
+    error: Optional[ContentGenerationError] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+# Short style hints injected into the prompt per target platform
+PLATFORM_GUIDELINES = {
+    "Instagram": "visual storytelling, casual tone, 10-15 hashtags, 125-150 character captions",
+    "LinkedIn": "professional thought leadership, 3-5 hashtags, longer captions are fine",
+    "Twitter": "concise and punchy, under 280 characters including hashtags, 1-2 hashtags",
+    "Facebook": "friendly and conversational, invite comments, 2-3 hashtags",
+    "TikTok": "energetic and trend-aware, short hook first, 3-5 hashtags",
+    "Pinterest": "descriptive and keyword-rich for search, 2-5 hashtags",
+    "YouTube Community": "conversational update for subscribers, ask a question, 1-3 hashtags"
+}
+
 class GeminiContentGenerator:
-    def __init__(self, api_key: str, temperature: float = 0.7):
+    def __init__(
+        self,
+        api_key: str,
+        temperature: float = 0.7,
+        http_client: Optional[PooledHTTPClient] = None,
+        cache: Optional[GenerationCache] = None,
+        model: str = "gemini-2.0-flash",
+        sentiment_batch_size: int = 8,
+        retry_policy: Optional[RetryPolicy] = None,
+        image_preprocessor: Optional[ImagePreprocessor] = None,
+        coalesce_requests: bool = True,
+        sentiment_cache: Optional[SentimentCache] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        hedger: Optional[Hedger] = None,
+        base_url: str = GEMINI_BASE_URL
+    ):
         self.api_key = api_key
         self.temperature = temperature
-        self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={api_key}"
+        self.model = model
+        # Shared keep-alive pool; avoids a TCP/TLS handshake per request
+        self.http_client = http_client or get_shared_http_client(base_url=base_url)
+        self.cache = cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_stats = RetryStats()
+        # Fails fast while the API is degraded instead of waiting out timeouts
+        self.circuit_breaker = circuit_breaker
+        # Sends a backup request when a call is slower than recent latencies
+        self.hedger = hedger
+        self.image_preprocessor = image_preprocessor
+        # Identical concurrent requests share one in-flight API call
+        self.single_flight = SingleFlight() if coalesce_requests else None
+        self.sentiment_model = get_sentiment_model()
+        self.sentiment_cache = sentiment_cache or SentimentCache()
+        self.sentiment_batch_size = sentiment_batch_size
+        # Recent batched inference timings, newest last
+        self._sentiment_timings = deque(maxlen=100)
+        self._sentiment_lock = threading.Lock()
+        # Counters for malformed-output salvage and top-up calls
+        self._parse_stats = {'responses': 0, 'salvaged_responses': 0, 'salvaged_posts': 0, 'topups': 0, 'blocked': 0}
+        self._parse_lock = threading.Lock()
+        # Estimated input tokens of recent API requests, newest last
+        self._input_tokens = deque(maxlen=100)
+        # Overridable so tests and benchmarks can target mock_gemini_server.py
+        base_url = base_url.rstrip("/")
+        self.api_url = f"{base_url}/v1beta/models/{model}:generateContent?key={api_key}"
+        self.stream_url = f"{base_url}/v1beta/models/{model}:streamGenerateContent?alt=sse&key={api_key}"
+
+    def cache_key(self, request: ContentRequest, namespace: str = "") -> str:
+        """Canonical cache key for a request under this generator's model settings"""
+        return make_request_key(request, self.model, self.temperature, namespace)
 
     def _analyze_sentiment(self, text: str) -> str:
         """Helper to run inference on generated captions."""
-        if not SENTIMENT_ENABLED:
-            return "Analysis Disabled"
+        return self._analyze_sentiment_batch([text])[0]
+
+    def _analyze_sentiment_batch(self, texts: List[str]) -> List[str]:
+        """
+        Score many captions with one batched pipeline call.
+        
+        Args:
+            texts: Captions to analyze
+            
+        Returns:
+            Sentiment labels in the same order as texts
+        """
+        if not texts:
+            return []
+        
+        # Content-addressed cache first; only misses reach the model
+        labels: List[Optional[str]] = [None] * len(texts)
+        if self.sentiment_cache is not None:
+            labels = self.sentiment_cache.get_many(texts, self.sentiment_model.cache_id)
+        missing = [i for i, label in enumerate(labels) if label is None]
+        if not missing:
+            return labels
+        
+        # Never block generation on model loading
+        analyzer = self.sentiment_model.get()
+        if analyzer is None:
+            fallback = "Analysis Disabled" if not self.sentiment_model.is_enabled else SENTIMENT_PENDING
+            return [label if label is not None else fallback for label in labels]
+        
+        missing_texts = [texts[i] for i in missing]
+        start = time.perf_counter()
         try:
-            # Use first 512 tokens for BERT-based models
-            result = SENTIMENT_ANALYZER(text[:512])[0]
-            return f"{result['label']} ({result['score']:.2f})"
+            # Token-level truncation to the 512-token BERT limit
+            results = analyzer(
+                missing_texts,
+                batch_size=self.sentiment_batch_size,
+                truncation=True,
+                max_length=512
+            )
         except Exception as e:
-            return f"Error: {str(e)}"
+            return [label if label is not None else f"Error: {str(e)}" for label in labels]
+        
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._sentiment_lock:
+            self._sentiment_timings.append({
+                'captions': len(missing_texts),
+                'batch_size': self.sentiment_batch_size,
+                'elapsed_ms': elapsed_ms,
+                'ms_per_caption': elapsed_ms / len(missing_texts)
+            })
+        logger.debug(f"Sentiment batch of {len(missing_texts)} scored in {elapsed_ms:.1f} ms")
+        
+        scored = [f"{r['label']} ({r['score']:.2f})" for r in results]
+        if self.sentiment_cache is not None:
+            self.sentiment_cache.put_many(missing_texts, scored, self.sentiment_model.cache_id)
+        for i, label in zip(missing, scored):
+            labels[i] = label
+        return labels
+
+    def get_sentiment_stats(self) -> Dict[str, Any]:
+        """Get per-batch sentiment inference timings"""
+        with self._sentiment_lock:
+            timings = list(self._sentiment_timings)
+        captions = sum(t['captions'] for t in timings)
+        total_ms = sum(t['elapsed_ms'] for t in timings)
+        return {
+            'cache': self.sentiment_cache.get_stats() if self.sentiment_cache is not None else None,
+            'batches': len(timings),
+            'captions': captions,
+            'avg_ms_per_batch': total_ms / len(timings) if timings else 0.0,
+            'avg_ms_per_caption': total_ms / captions if captions else 0.0,
+            'recent': timings[-10:]
+        }
+
+    def get_parse_stats(self) -> Dict[str, Any]:
+        """Get response parsing and salvage counters"""
+        with self._parse_lock:
+            return dict(self._parse_stats)
+
+    def _count_parse(self, **increments: int) -> None:
+        with self._parse_lock:
+            for name, amount in increments.items():
+                self._parse_stats[name] += amount
+
+    def estimate_input_tokens(
+        self,
+        request: ContentRequest,
+        image: Optional[ProcessedImage] = None
+    ) -> Dict[str, int]:
+        """
+        Estimate the input tokens a request will use, without calling the API.
+        
+        Args:
+            request: ContentRequest to estimate
+            image: Already prepared image, if any
+            
+        Returns:
+            Dict with prompt_tokens, image_tokens and total_tokens
+        """
+        prompt_tokens = estimate_tokens(self._build_prompt(request))
+        image_tokens = 0
+        if request.image_data:
+            image = image or self._prepare_image(request)
+            image_tokens = estimate_image_tokens(image.width, image.height, image.data)
+        return {
+            'prompt_tokens': prompt_tokens,
+            'image_tokens': image_tokens,
+            'total_tokens': prompt_tokens + image_tokens
+        }
+
+    def get_token_stats(self) -> Dict[str, Any]:
+        """Get estimated input tokens of recent API requests"""
+        with self._parse_lock:
+            recent = list(self._input_tokens)
+        return {
+            'requests': len(recent),
+            'avg_input_tokens': sum(recent) / len(recent) if recent else 0.0,
+            'max_input_tokens': max(recent, default=0)
+        }
+
+    def _record_input_tokens(self, request: ContentRequest, image: Optional[ProcessedImage]) -> None:
+        tokens = self.estimate_input_tokens(request, image)
+        with self._parse_lock:
+            self._input_tokens.append(tokens['total_tokens'])
+        logger.info(
+            f"📏 Estimated input: ~{tokens['total_tokens']} tokens "
+            f"(prompt {tokens['prompt_tokens']}, image {tokens['image_tokens']})"
+        )
 
     def generate(self, request: ContentRequest) -> List[GeneratedPost]:
         """
         Generate social media content based on request.
+        Identical requests are served from the response cache when enabled.
         
         Args:
             request: ContentRequest with generation parameters
@@ -123,56 +277,291 @@ class GeminiContentGenerator:
         Raises:
             ContentGenerationError: If generation fails (with sanitized message)
         """
-        try:
-            # Build prompt and payload
-            prompt = self._build_prompt(request)
-            payload = self._build_payload(prompt, request)
+        return self._generate(request)
+
+    def _generate(self, request: ContentRequest, image: Optional[ProcessedImage] = None) -> List[GeneratedPost]:
+        """Coalesced, cache-aware generation, optionally reusing an already prepared image."""
+        key = self.cache_key(request)
+        if self.single_flight is None:
+            return self._generate_keyed(key, request, image)
+        return self.single_flight.do(key, lambda: self._generate_keyed(key, request, image))
+
+    def _generate_keyed(
+        self,
+        key: str,
+        request: ContentRequest,
+        image: Optional[ProcessedImage] = None
+    ) -> List[GeneratedPost]:
+        if self.cache is None:
+            return self._generate_uncached(request, image)
+        
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info("⚡ Served generation from response cache")
+            return cached
+        
+        posts = self._generate_uncached(request, image)
+        if self.is_cacheable(request, posts):
+            self.cache.put(key, posts)
+        return posts
+
+    @staticmethod
+    def is_cacheable(request: ContentRequest, posts: List[GeneratedPost]) -> bool:
+        """
+        Whether posts may be stored in the response cache for request.
+        
+        Partial results (after salvage and a failed top-up) and captions whose
+        sentiment is still pending would otherwise be served for the whole TTL.
+        """
+        return (
+            len(posts) >= request.num_generations
+            and all(p.sentiment != SENTIMENT_PENDING for p in posts)
+        )
+
+    def _generate_uncached(
+        self,
+        request: ContentRequest,
+        image: Optional[ProcessedImage] = None
+    ) -> List[GeneratedPost]:
+        """Call the Gemini API for a request, bypassing the response cache."""
+        with self._translate_errors():
+            result = self._request_items(request, image)
+            items = result.items
             
-            # Make API request
-            logger.info("Sending request to Gemini API...")
-            response = requests.post(
-                self.api_url,
-                json=payload,
-                timeout=30
-            )
+            # Top up once if salvage or a short answer left us below the requested count
+            missing = request.num_generations - len(items)
+            if missing > 0:
+                logger.info(f"🩹 Requesting {missing} more post(s) to replace unusable output")
+                self._count_parse(topups=1)
+                try:
+                    with self._translate_errors():
+                        topup = self._request_items(replace(request, num_generations=missing), image)
+                    items = items + topup.items[:missing]
+                except ContentGenerationError as e:
+                    if not items:
+                        raise
+                    logger.warning(f"⚠️ Top-up request failed, returning partial results: {e}")
             
-            # Handle specific HTTP errors with user-friendly messages
-            if response.status_code == 429:
-                logger.warning("Rate limit exceeded (429)")
+            if not items:
                 raise ContentGenerationError(
-                    "The AI service is currently busy (Rate Limit). "
-                    "Please wait a minute and try again."
+                    "The AI service returned no usable content. Please try again."
                 )
             
-            if response.status_code == 401:
-                logger.error("Authentication failed (401)")
-                raise ContentGenerationError(
-                    "API authentication failed. Please check your API key configuration."
-                )
+            logger.info("Successfully received response from API")
+            return self._to_posts(items)
+
+    def _request_items(
+        self,
+        request: ContentRequest,
+        image: Optional[ProcessedImage] = None
+    ) -> ParseResult:
+        """Make one generateContent call and parse the post objects it returns."""
+        # Build prompt and payload
+        prompt = self._build_prompt(request)
+        payload = self._build_payload(prompt, request, image)
+        self._record_input_tokens(request, image)
+        
+        # Make API request (transient failures are retried within the deadline)
+        logger.info("Sending request to Gemini API...")
+        response = self._call_api(payload)
+        self._check_status(response)
+        return self._parse_result(loads(response.content))
+
+    def generate_per_platform(self, request: ContentRequest) -> Dict[str, GenerationResult]:
+        """
+        Generate platform-specific captions for every selected platform concurrently.
+        
+        Args:
+            request: ContentRequest whose platforms are fanned out
             
-            if response.status_code == 403:
-                logger.error("Access forbidden (403)")
-                raise ContentGenerationError(
-                    "Access denied. Your API key may not have the required permissions."
-                )
+        Returns:
+            Mapping of platform to its GenerationResult, in selection order
+        """
+        requests_by_platform = {
+            platform: replace(request, platforms=[platform])
+            for platform in request.platforms
+        }
+        return self.generate_for_platforms(requests_by_platform)
+
+    def generate_for_platforms(
+        self,
+        requests_by_platform: Dict[str, ContentRequest]
+    ) -> Dict[str, GenerationResult]:
+        """
+        Run one generation per platform concurrently, sharing the prepared image.
+        Total latency is close to the slowest single call.
+        
+        Args:
+            requests_by_platform: Platform-specific requests (all with the same image)
             
-            if response.status_code >= 500:
-                logger.error(f"Server error ({response.status_code})")
-                raise ContentGenerationError(
-                    f"The AI service is experiencing issues (Error {response.status_code}). "
-                    "Please try again later."
-                )
+        Returns:
+            Mapping of platform to its GenerationResult, in input order
+        """
+        if not requests_by_platform:
+            return {}
+        
+        # Pre-process and base64-encode the image once for every platform
+        first = next(iter(requests_by_platform.values()))
+        image = self._prepare_image(first) if first.image_data else None
+        
+        def run(index: int, request: ContentRequest) -> GenerationResult:
+            try:
+                return GenerationResult(index=index, request=request, posts=self._generate(request, image))
+            except ContentGenerationError as e:
+                return GenerationResult(index=index, request=request, error=e)
+        
+        logger.info(f"🌐 Fanning out generation to {len(requests_by_platform)} platforms")
+        with ThreadPoolExecutor(
+            max_workers=len(requests_by_platform),
+            thread_name_prefix="platform-fanout"
+        ) as executor:
+            futures = {
+                platform: executor.submit(run, i, request)
+                for i, (platform, request) in enumerate(requests_by_platform.items())
+            }
+            return {platform: future.result() for platform, future in futures.items()}
+
+    def generate_stream(self, request: ContentRequest) -> Iterator[GeneratedPost]:
+        """
+        Generate content via streamGenerateContent, yielding each post as
+        soon as its JSON object is complete.
+        
+        Args:
+            request: ContentRequest with generation parameters
             
-            # Raise for any other HTTP errors
-            response.raise_for_status()
+        Yields:
+            GeneratedPost objects in generation order
             
-            # Parse and return results
-            logger.info("Successfully received response from API")
-            return self._parse_response(response.json())
+        Raises:
+            ContentGenerationError: If generation fails (with sanitized message)
+        """
+        key = self.cache_key(request)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info("⚡ Served generation from response cache")
+                yield from cached
+                return
+        
+        if self.single_flight is None:
+            yield from self._stream_keyed(key, request)
+            return
+        
+        # The leader streams; identical concurrent requests wait for its finished list
+        leader, call = self.single_flight.acquire(key)
+        if not leader:
+            posts = self.single_flight.wait(call)
+            yield from posts if not call.abandoned else self._generate(request)
+            return
+        
+        posts = []
+        try:
+            for post in self._stream_keyed(key, request):
+                posts.append(post)
+                yield post
+        except GeneratorExit:
+            self.single_flight.release(key, call, abandoned=True)
+            raise
+        except BaseException as e:
+            self.single_flight.release(key, call, error=e)
+            raise
+        self.single_flight.release(key, call, result=posts)
+    
+    def _stream_keyed(self, key: str, request: ContentRequest) -> Iterator[GeneratedPost]:
+        """Stream one request from the API and cache the finished posts."""
+        posts = []
+        with self._translate_errors():
+            prompt = self._build_prompt(request)
+            payload = self._build_payload(prompt, request)
+            self._record_input_tokens(request, None)
+            
+            logger.info("Streaming request to Gemini API...")
+            response = self._call_api(payload, stream=True)
+            try:
+                self._check_status(response)
+                parser = IncrementalJSONArrayParser()
+                finish_reason = None
+                for chunk in iter_sse_data(response.iter_lines()):
+                    finish_reason = get_finish_reason(chunk) or finish_reason
+                    block_reason = (chunk.get("promptFeedback") or {}).get("blockReason")
+                    if block_reason:
+                        self._raise_blocked(block_reason)
+                    for item in parser.feed(extract_candidate_text(chunk)):
+                        post = self._to_post(item, self._analyze_sentiment(item.get("caption", "")))
+                        posts.append(post)
+                        yield post
+            finally:
+                response.close()
+        
+        if not posts and finish_reason in BLOCKED_FINISH_REASONS:
+            self._raise_blocked(finish_reason)
+        
+        # Top up once, like _generate_uncached, if malformed or short output left us below the requested count
+        missing = request.num_generations - len(posts)
+        if missing > 0:
+            logger.info(f"🩹 Requesting {missing} more post(s) to replace unusable output")
+            self._count_parse(topups=1)
+            try:
+                with self._translate_errors():
+                    topup = self._request_items(replace(request, num_generations=missing))
+                for post in self._to_posts(topup.items[:missing]):
+                    posts.append(post)
+                    yield post
+            except ContentGenerationError as e:
+                if not posts:
+                    raise
+                logger.warning(f"⚠️ Top-up request failed, returning partial results: {e}")
+        
+        if not posts:
+            raise ContentGenerationError(
+                "The AI service returned no content. Please try again."
+            )
+        
+        logger.info(f"Streamed {len(posts)} posts from API")
+        if self.cache is not None and self.is_cacheable(request, posts):
+            self.cache.put(key, posts)
+
+    def _check_status(self, response) -> None:
+        """Raise a sanitized ContentGenerationError for unsuccessful API responses."""
+        # Handle specific HTTP errors with user-friendly messages
+        if response.status_code == 429:
+            logger.warning("Rate limit exceeded (429)")
+            raise ContentGenerationError(
+                "The AI service is currently busy (Rate Limit). "
+                "Please wait a minute and try again."
+            )
+        
+        if response.status_code == 401:
+            logger.error("Authentication failed (401)")
+            raise ContentGenerationError(
+                "API authentication failed. Please check your API key configuration."
+            )
+        
+        if response.status_code == 403:
+            logger.error("Access forbidden (403)")
+            raise ContentGenerationError(
+                "Access denied. Your API key may not have the required permissions."
+            )
+        
+        if response.status_code >= 500:
+            logger.error(f"Server error ({response.status_code})")
+            raise ContentGenerationError(
+                f"The AI service is experiencing issues (Error {response.status_code}). "
+                "Please try again later."
+            )
+        
+        # Raise for any other HTTP errors
+        response.raise_for_status()
+
+    @contextmanager
+    def _translate_errors(self):
+        """Convert transport and parsing failures into sanitized ContentGenerationErrors."""
+        try:
+            yield
             
         except requests.exceptions.HTTPError as e:
             # Log the full error internally (with URL) but don't expose it to users
-            status_code = e.response.status_code if e.response else "Unknown"
+            status_code = e.response.status_code if e.response is not None else "Unknown"
             logger.error(f"HTTP Error {status_code}: {str(e)}")
             
             # Raise sanitized error for users
@@ -192,6 +581,13 @@ class GeminiContentGenerator:
                 "Request timed out. The service may be slow. Please try again."
             )
             
+        except CircuitOpenError as e:
+            logger.warning(f"Request rejected: {str(e)}")
+            raise ContentGenerationError(
+                "The AI service is temporarily unavailable. "
+                f"Please try again in about {max(e.retry_in, 1):.0f} seconds."
+            )
+            
         except ContentGenerationError:
             # Re-raise our custom errors as-is (already sanitized)
             raise
@@ -203,29 +599,117 @@ class GeminiContentGenerator:
                 "An unexpected error occurred while generating content. Please try again."
             )
 
+    def _call_api(self, payload: Dict[str, Any], stream: bool = False):
+        """
+        Make one logical API call: retries inside, one circuit-breaker outcome outside.
+        
+        Recording the call rather than each attempt keeps a 429 that a retry
+        recovered from out of the breaker's failure rate.
+        """
+        breaker = self.circuit_breaker
+        admission = breaker.before_call() if breaker is not None else None
+        start = time.perf_counter()
+        try:
+            response = call_with_retry(
+                lambda remaining: self._post(payload, remaining, stream=stream),
+                self.retry_policy,
+                self.retry_stats
+            )
+        except Exception:
+            if breaker is not None:
+                breaker.record(False, time.perf_counter() - start, admission)
+            raise
+        
+        if breaker is not None:
+            healthy = response.status_code != 429 and response.status_code < 500
+            breaker.record(healthy, time.perf_counter() - start, admission)
+        return response
+
+    def _post(self, payload: Dict[str, Any], remaining: float, stream: bool = False):
+        """Send one API attempt, never waiting past the remaining retry deadline."""
+        settings = self.http_client.settings
+        read_timeout = max(min(settings.read_timeout, remaining), 0.1)
+        send = lambda: self.http_client.post(
+            self.stream_url if stream else self.api_url,
+            json=payload,
+            timeout=(settings.connect_timeout, read_timeout),
+            stream=stream
+        )
+        # Streams are consumed incrementally, so only blocking calls are hedged
+        if self.hedger is not None and not stream:
+            return self.hedger.call(
+                send,
+                discard=lambda r: r.close(),
+                accept=lambda r: r.status_code not in self.retry_policy.retry_statuses
+            )
+        return send()
+
     def _build_prompt(self, request: ContentRequest) -> str:
         prompt = f"Generate {request.num_generations} social media posts. Keywords: {request.keywords}. Tone: {request.post_type}."
+        if request.platforms:
+            prompt += f" Target platforms: {', '.join(request.platforms)}."
+            if len(request.platforms) == 1 and request.platforms[0] in PLATFORM_GUIDELINES:
+                prompt += f" Follow {request.platforms[0]} conventions: {PLATFORM_GUIDELINES[request.platforms[0]]}."
         if request.image_data:
             prompt += " Analyze the provided image and include its context."
         prompt += "\nOutput as JSON array: [{'caption': '...', 'hashtags': ['...'], 'emojis': '...'}]"
         return prompt
 
-    def _build_payload(self, prompt: str, request: ContentRequest) -> Dict[str, Any]:
+    def _prepare_image(self, request: ContentRequest) -> ProcessedImage:
+        """Downscale and re-encode the request image when a pre-processor is configured."""
+        if self.image_preprocessor is None:
+            return ProcessedImage(
+                data=request.image_data,
+                mime_type=request.image_mime_type,
+                original_bytes=len(request.image_data)
+            )
+        return self.image_preprocessor.process(request.image_data, request.image_mime_type)
+
+    def _build_payload(
+        self,
+        prompt: str,
+        request: ContentRequest,
+        image: Optional[ProcessedImage] = None
+    ) -> Dict[str, Any]:
         parts = [{"text": prompt}]
         if request.image_data:
-            parts.append({"inlineData": {"mimeType": request.image_mime_type, "data": base64.b64encode(request.image_data).decode()}})
+            image = image or self._prepare_image(request)
+            parts.append({"inlineData": {"mimeType": image.mime_type, "data": image.base64()}})
         return {"contents": [{"parts": parts}], "generationConfig": {"temperature": self.temperature, "responseMimeType": "application/json"}}
 
     def _parse_response(self, response_data: Dict[str, Any]) -> List[GeneratedPost]:
-        json_string = response_data["candidates"][0]["content"]["parts"][0]["text"]
-        parsed = json.loads(json_string)
-        posts = []
-        for item in parsed:
-            cap = item.get("caption", "")
-            posts.append(GeneratedPost(
-                caption=cap,
-                hashtags=[f"#{h}" for h in item.get("hashtags", [])],
-                emojis=item.get("emojis", "✨"),
-                sentiment=self._analyze_sentiment(cap) # Perform analysis
-            ))
-        return posts
\ No newline at end of file
+        """Parse a generateContent body into posts (no top-up)."""
+        return self._to_posts(self._parse_result(response_data).items)
+
+    def _parse_result(self, response_data: Dict[str, Any]) -> ParseResult:
+        result = parse_generation_response(response_data)
+        self._count_parse(
+            responses=1,
+            salvaged_responses=int(result.salvaged),
+            salvaged_posts=len(result.items) if result.salvaged else 0
+        )
+        if result.blocked:
+            self._raise_blocked(result.block_reason)
+        return result
+
+    def _raise_blocked(self, reason: str) -> None:
+        self._count_parse(blocked=1)
+        logger.warning(f"🛡️ Generation blocked by the API ({reason})")
+        raise ContentGenerationError(
+            "The AI service declined to generate content for this request (safety filters). "
+            "Please rephrase your keywords and try again."
+        )
+
+    def _to_posts(self, items: List[Dict[str, Any]]) -> List[GeneratedPost]:
+        captions = [item.get("caption", "") for item in items]
+        # One batched forward pass for all captions
+        sentiments = self._analyze_sentiment_batch(captions)
+        return [self._to_post(item, sentiment) for item, sentiment in zip(items, sentiments)]
+
+    def _to_post(self, item: Dict[str, Any], sentiment: Optional[str]) -> GeneratedPost:
+        return GeneratedPost(
+            caption=item.get("caption", ""),
+            hashtags=[f"#{h}" for h in item.get("hashtags", [])],
+            emojis=item.get("emojis", "✨"),
+            sentiment=sentiment
+        )
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""
+Hedged API Requests
+
+Cuts tail latency by sending a second, identical request when the first
+has not answered within a percentile of recent latencies. Whichever
+response arrives first is used and the other is discarded. A rolling cap
+on the fraction of hedged calls keeps extra quota use bounded.
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
+from typing import Any, Callable, Dict, Optional
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HedgingSettings:
+    """
+    Hedging settings.
+
+    Attributes:
+        percentile: Recent-latency percentile after which a hedge is sent (0-1)
+        min_delay: Never hedge sooner than this many seconds
+        max_hedge_rate: Maximum fraction of recent calls that may be hedged
+        min_samples: Latency samples required before hedging starts
+        window_size: Number of recent latencies and calls tracked
+        max_workers: Threads available for in-flight primaries and hedges
+    """
+
+    percentile: float = 0.95
+    min_delay: float = 0.5
+    max_hedge_rate: float = 0.1
+    min_samples: int = 20
+    window_size: int = 200
+    max_workers: int = 32
+
+
+class Hedger:
+    """
+    Runs a blocking call with an optional latency-triggered hedge.
+    """
+
+    def __init__(self, settings: Optional[HedgingSettings] = None):
+        """
+        Initialize hedger.
+
+        Args:
+            settings: Hedging thresholds (defaults if None)
+        """
+        self.settings = settings or HedgingSettings()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.settings.max_workers,
+            thread_name_prefix="gemini-hedge"
+        )
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=self.settings.window_size)
+        # Whether each recent call was hedged, newest last
+        self._hedged = deque(maxlen=self.settings.window_size)
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.cancelled = 0
+        self.rate_limited = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Seconds to wait before hedging, from recent latencies.
+
+        Returns:
+            Delay in seconds, or None until enough samples are collected
+        """
+        with self._lock:
+            if len(self._latencies) < self.settings.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(int(len(ordered) * self.settings.percentile), len(ordered) - 1)
+        return max(ordered[index], self.settings.min_delay)
+
+    def call(
+        self,
+        send: Callable[[], Any],
+        discard: Optional[Callable[[Any], None]] = None,
+        accept: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Run send(), hedging with a second send() if it is slow.
+
+        Args:
+            send: Function performing one request and returning a response
+            discard: Releases a losing response (e.g. response.close)
+            accept: Whether a response may win (e.g. not a 429/5xx); all do if None
+
+        Returns:
+            The first acceptable response, else the last response to arrive
+
+        Raises:
+            The last error if every attempt failed
+        """
+        delay = self.hedge_delay()
+        primary = self._executor.submit(self._timed, send)
+
+        try:
+            response = primary.result(timeout=delay)
+            self._finish(hedged=False)
+            return response
+        except FuturesTimeout:
+            pass
+        except BaseException:
+            self._finish(hedged=False)
+            raise
+
+        if not self._allow_hedge():
+            self._finish(hedged=False)
+            return primary.result()
+
+        logger.info(f"🏁 No response after {delay:.2f}s, sending hedged request")
+        hedge = self._executor.submit(self._timed, send)
+        self._finish(hedged=True)
+
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        rejected: Optional[Future] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                if accept is not None and not accept(future.result()):
+                    # A fast 429/5xx must not beat a request that may still succeed
+                    if rejected is not None and discard is not None:
+                        self._release(rejected, discard)
+                    rejected = future
+                    continue
+                for loser in pending:
+                    self._abandon(loser, discard)
+                if rejected is not None and discard is not None:
+                    self._release(rejected, discard)
+                if future is hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                    logger.info("🏁 Hedged request won")
+                return future.result()
+        if rejected is not None:
+            return rejected.result()
+        raise error
+
+    def _timed(self, send: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        response = send()
+        with self._lock:
+            self._latencies.append(time.perf_counter() - start)
+        return response
+
+    def _allow_hedge(self) -> bool:
+        with self._lock:
+            hedged = sum(self._hedged)
+            # Count this call as hedged when checking the cap
+            allowed = (hedged + 1) / (len(self._hedged) + 1) <= self.settings.max_hedge_rate
+            if not allowed:
+                self.rate_limited += 1
+            return allowed
+
+    def _finish(self, hedged: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self.hedges += int(hedged)
+            self._hedged.append(hedged)
+
+    def _abandon(self, future: Future, discard: Optional[Callable[[Any], None]]) -> None:
+        """Cancel a losing request, or release its response when it arrives"""
+        if future.cancel():
+            with self._lock:
+                self.cancelled += 1
+            return
+        if discard is None:
+            return
+        future.add_done_callback(lambda finished: self._release(finished, discard))
+
+    @staticmethod
+    def _release(future: Future, discard: Callable[[Any], None]) -> None:
+        if not future.cancelled() and future.exception() is None:
+            try:
+                discard(future.result())
+            except Exception as e:
+                logger.debug(f"Failed to release hedged response: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedging counters and the current hedge delay"""
+        delay = self.hedge_delay()
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'hedge_rate': self.hedges / self.calls if self.calls else 0.0,
+                'win_rate': self.hedge_wins / self.hedges if self.hedges else 0.0,
+                'cancelled': self.cancelled,
+                'rate_limited': self.rate_limited,
+                'hedge_delay_s': delay
+            }
+
+    def close(self) -> None:
+        """Shut down the worker threads"""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,321 @@
+"""
+Pooled HTTP Client for the Gemini API
+
+Provides a long-lived, thread-safe connection pool shared by every
+Streamlit session so generation requests reuse warm TCP/TLS connections
+instead of paying a fresh handshake on every click.
+"""
+
+import threading
+import weakref
+import logging
+from typing import Any, Dict, Optional, Set, Tuple
+from dataclasses import dataclass
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com"
+
+
+@dataclass(frozen=True)
+class HTTPClientSettings:
+    """
+    Connection pool settings.
+
+    Attributes:
+        pool_connections: Number of host pools to keep
+        pool_maxsize: Maximum connections kept open per host
+        keepalive: Keep idle connections open between requests
+        keepalive_expiry: Seconds an idle connection may live (HTTP/2 backend only)
+        http2: Use HTTP/2 multiplexing when httpx[http2] is installed
+        connect_timeout: Seconds allowed to establish a connection
+        read_timeout: Seconds allowed between bytes of the response
+        warmup: Open a connection to the API host at startup
+    """
+
+    pool_connections: int = 4
+    pool_maxsize: int = 16
+    keepalive: bool = True
+    keepalive_expiry: float = 60.0
+    http2: bool = False
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    warmup: bool = True
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeout tuple"""
+        return (self.connect_timeout, self.read_timeout)
+
+
+class PooledHTTPClient:
+    """
+    Thread-safe keep-alive HTTP client with connection reuse counters.
+
+    Uses a ``requests.Session`` with a sized ``HTTPAdapter`` by default.
+    When HTTP/2 is requested and ``httpx`` with ``h2`` is installed, an
+    ``httpx.Client`` is used instead; its exceptions are translated into the
+    ``requests.exceptions`` hierarchy so callers handle a single set of errors.
+    """
+
+    def __init__(self, settings: Optional[HTTPClientSettings] = None):
+        """
+        Initialize the connection pool.
+
+        Args:
+            settings: Pool settings (defaults used if None)
+        """
+        self.settings = settings or HTTPClientSettings()
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._httpx = None
+        # Weak so closed connections drop out instead of accumulating (and their ids being reused)
+        self._seen_streams: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        self._new_connections = 0
+        self.backend = "requests"
+
+        if self.settings.http2:
+            self._httpx = self._create_httpx_client()
+
+        if self._httpx is None:
+            self._session = self._create_session()
+        else:
+            self._session = None
+            self.backend = "httpx-http2"
+
+        logger.info(
+            f"🔌 HTTP pool ready (backend: {self.backend}, "
+            f"maxsize: {self.settings.pool_maxsize})"
+        )
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.settings.pool_connections,
+            pool_maxsize=self.settings.pool_maxsize,
+            pool_block=False
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.settings.keepalive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def _create_httpx_client(self):
+        try:
+            import httpx
+            import h2  # noqa: F401 - required by httpx for HTTP/2
+        except ImportError as e:
+            logger.warning(f"⚠️ HTTP/2 disabled: {e}")
+            logger.warning("💡 Install: pip install 'httpx[http2]'")
+            return None
+
+        limits = httpx.Limits(
+            max_connections=self.settings.pool_maxsize,
+            max_keepalive_connections=self.settings.pool_maxsize if self.settings.keepalive else 0,
+            keepalive_expiry=self.settings.keepalive_expiry
+        )
+        return httpx.Client(http2=True, limits=limits)
+
+    def post(
+        self,
+        url: str,
+        json: Dict[str, Any],
+        timeout: Optional[Tuple[float, float]] = None,
+        **kwargs
+    ):
+        """
+        POST a JSON payload through the shared pool.
+
+        Args:
+            url: Request URL
+            json: JSON-serializable body
+            timeout: Optional (connect, read) timeout override
+            stream: Pass ``stream=True`` to read the body incrementally
+
+        Returns:
+            Response object exposing ``status_code``, ``headers``, ``json()``,
+            ``iter_lines()``, ``close()`` and ``raise_for_status()``
+
+        Raises:
+            requests.exceptions.RequestException: On transport failures
+        """
+        timeout = timeout or self.settings.timeout
+        with self._lock:
+            self._requests += 1
+
+        try:
+            if self._httpx is not None:
+                return self._post_httpx(url, json, timeout, **kwargs)
+            return self._session.post(url, json=json, timeout=timeout, **kwargs)
+        except Exception:
+            with self._lock:
+                self._errors += 1
+            raise
+
+    def _post_httpx(self, url: str, payload: Dict[str, Any], timeout: Tuple[float, float], **kwargs):
+        import httpx
+
+        connect, read = timeout
+        stream = kwargs.pop("stream", False)
+        try:
+            request = self._httpx.build_request(
+                "POST",
+                url,
+                json=payload,
+                timeout=httpx.Timeout(read, connect=connect),
+                **kwargs
+            )
+            response = self._httpx.send(request, stream=stream)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+
+        network_stream = response.extensions.get("network_stream")
+        if network_stream is not None:
+            with self._lock:
+                if network_stream not in self._seen_streams:
+                    self._seen_streams.add(network_stream)
+                    self._new_connections += 1
+        return _HTTPXResponseAdapter(response)
+
+    def warm_up(self, base_url: str = GEMINI_BASE_URL) -> bool:
+        """
+        Open a connection to the API host so the first user request is warm.
+
+        Args:
+            base_url: Scheme and host to connect to
+
+        Returns:
+            bool: True if the host answered (any status code)
+        """
+        try:
+            timeout = (self.settings.connect_timeout, self.settings.connect_timeout)
+            if self._httpx is not None:
+                self._httpx.head(base_url, timeout=self.settings.connect_timeout)
+            else:
+                self._session.head(base_url, timeout=timeout)
+            logger.info(f"🔥 HTTP pool warmed up ({base_url})")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ HTTP pool warm-up failed: {type(e).__name__}")
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection reuse counters"""
+        with self._lock:
+            requests_sent = self._requests
+            errors = self._errors
+            new_connections = self._new_connections
+
+        if self._session is not None:
+            new_connections = self._count_urllib3_connections()
+
+        return {
+            'backend': self.backend,
+            'requests': requests_sent,
+            'errors': errors,
+            'new_connections': new_connections,
+            'reused_connections': max(requests_sent - errors - new_connections, 0),
+            'pool_maxsize': self.settings.pool_maxsize
+        }
+
+    def _count_urllib3_connections(self) -> int:
+        """Sum connections opened by every urllib3 host pool behind the session"""
+        total = 0
+        # The same adapter is mounted for http:// and https://; count each once
+        adapters = {id(adapter): adapter for adapter in self._session.adapters.values()}
+        for adapter in adapters.values():
+            pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+            if pools is None:
+                continue
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    total += getattr(pool, "num_connections", 0)
+        return total
+
+    def close(self) -> None:
+        """Close all pooled connections"""
+        if self._httpx is not None:
+            self._httpx.close()
+        if self._session is not None:
+            self._session.close()
+
+
+class _HTTPXResponseAdapter:
+    """Expose an httpx response through the subset of the requests API we use"""
+
+    def __init__(self, response):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+
+    def json(self) -> Any:
+        return self._response.json()
+
+    @property
+    def content(self) -> bytes:
+        return self._response.content
+
+    @property
+    def text(self) -> str:
+        return self._response.text
+
+    def iter_lines(self):
+        import httpx
+
+        try:
+            yield from self._response.iter_lines()
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+
+    def close(self) -> None:
+        self._response.close()
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            error = requests.exceptions.HTTPError(
+                f"{self.status_code} Error for url: {self._response.url}"
+            )
+            error.response = self
+            raise error
+
+
+_SHARED_CLIENTS: Dict[HTTPClientSettings, PooledHTTPClient] = {}
+_SHARED_LOCK = threading.Lock()
+# (settings, base_url) pairs already warmed, so each host is warmed once per pool
+_WARMED_HOSTS: Set[Tuple[HTTPClientSettings, str]] = set()
+
+
+def get_shared_http_client(
+    settings: Optional[HTTPClientSettings] = None,
+    base_url: str = GEMINI_BASE_URL
+) -> PooledHTTPClient:
+    """
+    Get the process-wide client for the given settings, creating it once.
+
+    Args:
+        settings: Pool settings (defaults used if None)
+        base_url: API host warmed up the first time it is requested
+
+    Returns:
+        PooledHTTPClient shared by all callers with identical settings
+    """
+    settings = settings or HTTPClientSettings()
+    with _SHARED_LOCK:
+        client = _SHARED_CLIENTS.get(settings)
+        if client is None:
+            client = PooledHTTPClient(settings)
+            _SHARED_CLIENTS[settings] = client
+        if settings.warmup and (settings, base_url) not in _WARMED_HOSTS:
+            _WARMED_HOSTS.add((settings, base_url))
+            client.warm_up(base_url)
+        return client
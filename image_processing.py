@@ -0,0 +1,201 @@
+"""
+Image Pre-processing for Multimodal Requests
+
+Downscales and re-encodes uploaded images before they are base64-encoded
+into the Gemini payload. Large phone photos are capped to a resolution the
+model actually uses, EXIF metadata is stripped, and results are cached by
+content hash so regenerations don't repeat the work.
+"""
+
+import io
+import math
+import base64
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+from dataclasses import dataclass, field
+
+from response_cache import TTLLRUCache
+
+logger = logging.getLogger(__name__)
+
+_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+
+@dataclass(frozen=True)
+class ImageProcessingSettings:
+    """
+    Pre-processing settings.
+
+    Attributes:
+        enabled: Run the pre-processing stage at all
+        max_pixels: Upper bound on width * height after resizing
+        output_format: "JPEG" or "WEBP"
+        quality: Encoder quality (1-100)
+        cache_max_mb: Size cap of the processed-image cache in megabytes
+        workers: Worker threads used for decoding and encoding
+    """
+
+    enabled: bool = True
+    max_pixels: int = 2_000_000
+    output_format: str = "JPEG"
+    quality: int = 85
+    cache_max_mb: int = 64
+    workers: int = 2
+
+
+@dataclass
+class ProcessedImage:
+    """Image ready to be embedded in a request payload"""
+    data: bytes
+    mime_type: str
+    original_bytes: int
+    elapsed_ms: float = 0.0
+    width: Optional[int] = None
+    height: Optional[int] = None
+    _encoded: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - len(self.data)
+
+    def base64(self) -> str:
+        """Base64 text of the image, encoded once and shared by every payload"""
+        if self._encoded is None:
+            self._encoded = base64.b64encode(self.data).decode()
+        return self._encoded
+
+
+class ImagePreprocessor:
+    """
+    Resize, strip metadata and re-encode images on a worker thread.
+    """
+
+    def __init__(self, settings: Optional[ImageProcessingSettings] = None):
+        """
+        Initialize pre-processor.
+
+        Args:
+            settings: Processing settings (defaults used if None)
+        """
+        self.settings = settings or ImageProcessingSettings()
+        if self.settings.output_format not in _MIME_TYPES:
+            raise ValueError(f"Unsupported image format: {self.settings.output_format}")
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.settings.workers,
+            thread_name_prefix="image-prep"
+        )
+        self._cache = TTLLRUCache(max_bytes=self.settings.cache_max_mb * 1024 * 1024, ttl_seconds=None)
+        self._lock = threading.Lock()
+        self._processed = 0
+        self._bytes_in = 0
+        self._bytes_out = 0
+        self._total_ms = 0.0
+        self.available = self._check_pillow()
+
+    @staticmethod
+    def _check_pillow() -> bool:
+        try:
+            import PIL  # noqa: F401
+            return True
+        except ImportError:
+            logger.warning("⚠️ Image pre-processing disabled (Pillow not installed)")
+            logger.warning("💡 Install: pip install Pillow")
+            return False
+
+    def process(self, data: bytes, mime_type: Optional[str]) -> ProcessedImage:
+        """
+        Pre-process an image, reusing a cached result for identical content.
+
+        Args:
+            data: Raw uploaded bytes
+            mime_type: Uploaded MIME type
+
+        Returns:
+            ProcessedImage (the original bytes if processing is disabled or fails)
+        """
+        if not self.settings.enabled or not self.available:
+            return ProcessedImage(data=data, mime_type=mime_type, original_bytes=len(data))
+
+        key = hashlib.sha256(data).hexdigest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            result = self._executor.submit(self._process, data).result()
+        except Exception as e:
+            logger.warning(f"⚠️ Image pre-processing failed, sending original: {type(e).__name__}: {e}")
+            return ProcessedImage(data=data, mime_type=mime_type, original_bytes=len(data))
+
+        self._cache.put(key, result, size=len(result.data))
+        with self._lock:
+            self._processed += 1
+            self._bytes_in += result.original_bytes
+            self._bytes_out += len(result.data)
+            self._total_ms += result.elapsed_ms
+
+        logger.info(
+            f"🖼️ Image {result.original_bytes / 1e6:.1f} MB → {len(result.data) / 1e6:.2f} MB "
+            f"({result.width}x{result.height}) in {result.elapsed_ms:.0f} ms"
+        )
+        return result
+
+    def _process(self, data: bytes) -> ProcessedImage:
+        from PIL import Image, ImageOps
+
+        start = time.perf_counter()
+        with Image.open(io.BytesIO(data)) as image:
+            # Apply the EXIF orientation before the metadata is dropped
+            image = ImageOps.exif_transpose(image)
+
+            width, height = image.size
+            scale = min(1.0, math.sqrt(self.settings.max_pixels / float(width * height)))
+            if scale < 1.0:
+                size = (max(1, int(width * scale)), max(1, int(height * scale)))
+                image = image.resize(size, Image.LANCZOS)
+
+            if self.settings.output_format == "JPEG" and image.mode != "RGB":
+                if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+                    rgba = image.convert("RGBA")
+                    background = Image.new("RGB", rgba.size, (255, 255, 255))
+                    background.paste(rgba, mask=rgba.split()[-1])
+                    image = background
+                else:
+                    image = image.convert("RGB")
+
+            output = io.BytesIO()
+            # No exif= argument is passed, so metadata is not written
+            image.save(
+                output,
+                format=self.settings.output_format,
+                quality=self.settings.quality,
+                optimize=True
+            )
+            processed_size = image.size
+
+        return ProcessedImage(
+            data=output.getvalue(),
+            mime_type=_MIME_TYPES[self.settings.output_format],
+            original_bytes=len(data),
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+            width=processed_size[0],
+            height=processed_size[1]
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get bytes saved and time spent"""
+        with self._lock:
+            return {
+                'enabled': self.settings.enabled and self.available,
+                'images_processed': self._processed,
+                'bytes_in': self._bytes_in,
+                'bytes_out': self._bytes_out,
+                'bytes_saved': self._bytes_in - self._bytes_out,
+                'total_ms': self._total_ms,
+                'cache': self._cache.get_stats()
+            }
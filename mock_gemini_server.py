@@ -0,0 +1,343 @@
+"""
+Mock Gemini API Server
+
+Local stand-in for the Gemini generateContent and streamGenerateContent
+endpoints, for load tests, benchmarks and offline development. Responses
+follow the real JSON shape, and latency and fault injection (429, 5xx,
+timeouts, malformed payloads) are configurable.
+
+Usage:
+    python mock_gemini_server.py --port 8765 --latency lognormal --latency-ms 800 \\
+        --rate-429 0.05 --rate-5xx 0.02 --rate-timeout 0.01 --rate-malformed 0.02
+
+    # Point the app at it
+    GEMINI_BASE_URL=http://127.0.0.1:8765 streamlit run app.py
+"""
+
+import re
+import json
+import math
+import time
+import random
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "exponential", "lognormal")
+
+_PATH = re.compile(r"^/v1beta/models/(?P<model>[^/:]+):(?P<method>generateContent|streamGenerateContent)$")
+_NUM_POSTS = re.compile(r"Generate (\d+) social media posts")
+_KEYWORDS = re.compile(r"Keywords: (.+?)\. Tone:", re.DOTALL)
+_TONE = re.compile(r"Tone: ([^.]+)\.")
+
+_EMOJIS = ["🚀", "✨", "🎉", "💡", "📈", "🔥", "🙌", "🌟"]
+_TEMPLATES = [
+    "{emoji} Big news: {keywords}! Here's why it matters for you.",
+    "We've been working on {keywords} and can't wait to share what's next {emoji}",
+    "{keywords} - three things we learned along the way. Thread below 👇",
+    "What does {keywords} mean for your team? Let's talk {emoji}",
+    "Behind the scenes of {keywords}. Proud of this team! {emoji}"
+]
+
+
+@dataclass(frozen=True)
+class MockServerSettings:
+    """
+    Mock server behaviour.
+
+    Attributes:
+        latency: Latency distribution (constant, uniform, exponential, lognormal)
+        latency_ms: Median (lognormal), mean (exponential) or fixed latency in milliseconds
+        latency_jitter: Spread: +/- fraction for uniform, sigma for lognormal
+        rate_429: Fraction of requests answered with 429 Too Many Requests
+        rate_5xx: Fraction of requests answered with 500/503
+        rate_timeout: Fraction of requests that hang for timeout_seconds
+        rate_malformed: Fraction of responses with truncated JSON output
+        timeout_seconds: How long a "timeout" request hangs
+        stream_chunks: SSE events per streamed response
+        seed: Random seed for reproducible fault sequences (None for random)
+    """
+
+    latency: str = "lognormal"
+    latency_ms: float = 800.0
+    latency_jitter: float = 0.5
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    rate_timeout: float = 0.0
+    rate_malformed: float = 0.0
+    timeout_seconds: float = 60.0
+    stream_chunks: int = 4
+    seed: Optional[int] = None
+
+
+class MockGeminiState:
+    """Random source and request counters shared by all handler threads"""
+
+    def __init__(self, settings: MockServerSettings):
+        self.settings = settings
+        self._random = random.Random(settings.seed)
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {
+            'requests': 0, 'ok': 0, '429': 0, '5xx': 0, 'timeout': 0, 'malformed': 0
+        }
+
+    def sample_latency(self) -> float:
+        """Draw one response latency in seconds"""
+        s = self.settings
+        with self._lock:
+            if s.latency == "constant":
+                ms = s.latency_ms
+            elif s.latency == "uniform":
+                ms = self._random.uniform(s.latency_ms * (1 - s.latency_jitter), s.latency_ms * (1 + s.latency_jitter))
+            elif s.latency == "exponential":
+                ms = self._random.expovariate(1 / s.latency_ms) if s.latency_ms > 0 else 0.0
+            else:
+                ms = self._random.lognormvariate(math.log(max(s.latency_ms, 1e-3)), s.latency_jitter)
+        return max(ms, 0.0) / 1000
+
+    def pick_fault(self) -> Optional[str]:
+        """Choose a fault for one request, or None for a normal response"""
+        s = self.settings
+        with self._lock:
+            self.counts['requests'] += 1
+            roll = self._random.random()
+            for name, rate in (('429', s.rate_429), ('5xx', s.rate_5xx),
+                               ('timeout', s.rate_timeout), ('malformed', s.rate_malformed)):
+                if roll < rate:
+                    self.counts[name] += 1
+                    return name
+                roll -= rate
+            self.counts['ok'] += 1
+            return None
+
+    def choice(self, items: List[Any]) -> Any:
+        with self._lock:
+            return self._random.choice(items)
+
+
+def build_posts(prompt: str, state: MockGeminiState) -> List[Dict[str, Any]]:
+    """
+    Build realistic post objects for a generation prompt.
+
+    Args:
+        prompt: Prompt text sent by GeminiContentGenerator
+        state: Shared random source
+
+    Returns:
+        List of {caption, hashtags, emojis} dicts
+    """
+    match = _NUM_POSTS.search(prompt)
+    count = int(match.group(1)) if match else 1
+    match = _KEYWORDS.search(prompt)
+    keywords = (match.group(1) if match else "our latest update").split("\n")[0].strip()
+    match = _TONE.search(prompt)
+    tone = match.group(1).strip() if match else "Professional"
+
+    words = [w for w in re.findall(r"[A-Za-z][A-Za-z0-9]+", keywords)][:3] or ["News"]
+    posts = []
+    for _ in range(count):
+        emoji = state.choice(_EMOJIS)
+        posts.append({
+            'caption': state.choice(_TEMPLATES).format(keywords=keywords, emoji=emoji),
+            'hashtags': [w.capitalize() for w in words] + [tone.replace(" ", "")],
+            'emojis': emoji + state.choice(_EMOJIS)
+        })
+    return posts
+
+
+def candidate_chunk(text: str, finish_reason: Optional[str] = None) -> Dict[str, Any]:
+    """Wrap text in the generateContent response envelope"""
+    candidate: Dict[str, Any] = {'content': {'parts': [{'text': text}], 'role': 'model'}, 'index': 0}
+    if finish_reason:
+        candidate['finishReason'] = finish_reason
+    return {'candidates': [candidate], 'modelVersion': 'mock-gemini'}
+
+
+def _prompt_text(body: Dict[str, Any]) -> str:
+    parts = (body.get('contents') or [{}])[0].get('parts') or []
+    return "".join(part.get('text', '') for part in parts)
+
+
+class MockGeminiHandler(BaseHTTPRequestHandler):
+    """Serves generateContent and streamGenerateContent requests"""
+
+    protocol_version = "HTTP/1.1"
+    state: MockGeminiState = None  # set by make_server
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format % args)
+
+    def do_HEAD(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self) -> None:
+        path = self.path.split("?", 1)[0]
+        match = _PATH.match(path)
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length) if length else b""
+        if match is None:
+            self._send_json(404, {'error': {'code': 404, 'message': f'Unknown path {path}', 'status': 'NOT_FOUND'}})
+            return
+
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            self._send_json(400, {'error': {'code': 400, 'message': 'Invalid JSON payload', 'status': 'INVALID_ARGUMENT'}})
+            return
+
+        fault = self.state.pick_fault()
+        time.sleep(self.state.sample_latency())
+
+        if fault == 'timeout':
+            time.sleep(self.state.settings.timeout_seconds)
+            self.close_connection = True
+            return
+        if fault == '429':
+            self._send_json(
+                429,
+                {'error': {'code': 429, 'message': 'Resource has been exhausted', 'status': 'RESOURCE_EXHAUSTED'}},
+                headers={'Retry-After': '1'}
+            )
+            return
+        if fault == '5xx':
+            code = self.state.choice([500, 503])
+            self._send_json(code, {'error': {'code': code, 'message': 'Mock upstream failure', 'status': 'UNAVAILABLE'}})
+            return
+
+        text = json.dumps(build_posts(_prompt_text(body), self.state), ensure_ascii=False)
+        if fault == 'malformed':
+            # Cut the model output mid-object, like a MAX_TOKENS truncation
+            text = text[:max(len(text) * 2 // 3, 1)]
+
+        if match.group('method') == 'streamGenerateContent':
+            self._send_stream(text, truncated=fault == 'malformed')
+        else:
+            self._send_json(200, candidate_chunk(text, 'MAX_TOKENS' if fault == 'malformed' else 'STOP'))
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, text: str, truncated: bool) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        chunks = max(self.state.settings.stream_chunks, 1)
+        size = math.ceil(len(text) / chunks)
+        pieces = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+        gap = self.state.sample_latency() / len(pieces)
+        for i, piece in enumerate(pieces):
+            last = i == len(pieces) - 1
+            finish = ('MAX_TOKENS' if truncated else 'STOP') if last else None
+            event = json.dumps(candidate_chunk(piece, finish), ensure_ascii=False)
+            try:
+                self.wfile.write(f"data: {event}\r\n\r\n".encode("utf-8"))
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            if not last:
+                time.sleep(gap)
+
+
+def make_server(
+    settings: Optional[MockServerSettings] = None,
+    host: str = "127.0.0.1",
+    port: int = 0
+) -> Tuple[ThreadingHTTPServer, MockGeminiState]:
+    """
+    Create a mock server (port 0 picks a free port).
+
+    Returns:
+        (server, shared state with fault counters)
+    """
+    state = MockGeminiState(settings or MockServerSettings())
+    handler = type("BoundMockGeminiHandler", (MockGeminiHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, state
+
+
+def start_mock_server(
+    settings: Optional[MockServerSettings] = None,
+    host: str = "127.0.0.1",
+    port: int = 0
+) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start a mock server on a background thread.
+
+    Example:
+        server, base_url = start_mock_server(MockServerSettings(latency_ms=50))
+        generator = GeminiContentGenerator(api_key="test", base_url=base_url)
+        ...
+        server.shutdown()
+
+    Returns:
+        (server, base URL to pass as GEMINI_BASE_URL)
+    """
+    server, _ = make_server(settings, host, port)
+    thread = threading.Thread(target=server.serve_forever, name="mock-gemini", daemon=True)
+    thread.start()
+    bound_host, bound_port = server.server_address[:2]
+    base_url = f"http://{bound_host}:{bound_port}"
+    logger.info(f"🧪 Mock Gemini server listening on {base_url}")
+    return server, base_url
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock Gemini API server with fault injection")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Median/mean latency in ms")
+    parser.add_argument("--latency-jitter", type=float, default=0.5, help="Uniform spread or lognormal sigma")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--rate-timeout", type=float, default=0.0)
+    parser.add_argument("--rate-malformed", type=float, default=0.0)
+    parser.add_argument("--timeout-seconds", type=float, default=60.0)
+    parser.add_argument("--stream-chunks", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    server, state = make_server(
+        MockServerSettings(
+            latency=args.latency,
+            latency_ms=args.latency_ms,
+            latency_jitter=args.latency_jitter,
+            rate_429=args.rate_429,
+            rate_5xx=args.rate_5xx,
+            rate_timeout=args.rate_timeout,
+            rate_malformed=args.rate_malformed,
+            timeout_seconds=args.timeout_seconds,
+            stream_chunks=args.stream_chunks,
+            seed=args.seed
+        ),
+        args.host,
+        args.port
+    )
+    logger.info(f"🧪 Mock Gemini server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info(f"📊 Requests served: {state.counts}")
+        server.server_close()
@@ -0,0 +1,326 @@
+"""
+Quantized ONNX Runtime Sentiment Backend
+
+Exports the DistilBERT SST-2 sentiment model to ONNX, applies dynamic int8
+quantization and serves it through ONNX Runtime. On CPU-only nodes this
+uses a fraction of the memory of the fp32 PyTorch pipeline and scores
+captions faster, with the same call signature as the transformers pipeline.
+
+The export needs torch and runs offline; serving only loads the exported
+files, so CPU nodes running SENTIMENT_BACKEND=onnx never load the fp32 model.
+
+Usage:
+    python onnx_sentiment.py --export      # Build the quantized model (offline step)
+    python onnx_sentiment.py --parity      # Compare labels with PyTorch
+    python onnx_sentiment.py --benchmark   # Compare latency and memory
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from sentiment_analyzer import SENTIMENT_MODEL_ID
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ONNX_DIR = ".cache/onnx_sentiment"
+FP32_FILENAME = "model.onnx"
+INT8_FILENAME = "model.int8.onnx"
+
+# Captions used by the parity check and the benchmark
+SAMPLE_CAPTIONS = [
+    "🚀 Excited to announce our latest AI innovation that's transforming content creation!",
+    "Behind the scenes at our office! Our team working on the next big thing.",
+    "We're sorry for the outage yesterday. Service was down for three hours.",
+    "Join us next week for a live Q&A with our product team.",
+    "This update broke everything and support never answered. Terrible experience.",
+    "5 tips to boost your engagement on LinkedIn this quarter 📈",
+    "Celebrating 10,000 happy customers - thank you for your trust! 🎉",
+    "Prices are going up next month.",
+    "Our new dashboard makes reporting effortless and fast.",
+    "Unfortunately the event has been cancelled due to weather."
+]
+
+
+def export_quantized_onnx(output_dir: str = DEFAULT_ONNX_DIR, opset: int = 14) -> Path:
+    """
+    Export the sentiment model to ONNX and quantize its weights to int8.
+
+    Args:
+        output_dir: Directory for the ONNX files and tokenizer
+        opset: ONNX opset version
+
+    Returns:
+        Path to the quantized model
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    fp32_path = out / FP32_FILENAME
+    int8_path = out / INT8_FILENAME
+
+    logger.info(f"📦 Exporting {SENTIMENT_MODEL_ID} to ONNX...")
+    tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL_ID)
+    model = AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL_ID)
+    model.eval()
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            str(fp32_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"}
+            },
+            opset_version=opset
+        )
+
+    logger.info("🗜️ Applying dynamic int8 quantization...")
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+
+    tokenizer.save_pretrained(str(out))
+    with open(out / "labels.json", "w", encoding="utf-8") as f:
+        json.dump({str(k): v for k, v in model.config.id2label.items()}, f)
+
+    logger.info(
+        f"✅ Quantized model saved ({fp32_path.stat().st_size / 1e6:.0f} MB → "
+        f"{int8_path.stat().st_size / 1e6:.0f} MB)"
+    )
+    return int8_path
+
+
+class OnnxSentimentPipeline:
+    """
+    Drop-in replacement for the transformers sentiment pipeline backed by ONNX Runtime.
+    """
+
+    def __init__(self, model_dir: str = DEFAULT_ONNX_DIR, threads: Optional[int] = None):
+        """
+        Load the quantized model exported by ``python onnx_sentiment.py --export``.
+
+        Args:
+            model_dir: Directory holding the ONNX files and tokenizer
+            threads: Intra-op thread count (ONNX Runtime default if None)
+
+        Raises:
+            FileNotFoundError: If the quantized model has not been exported
+        """
+        model_dir = Path(model_dir)
+        model_path = model_dir / INT8_FILENAME
+        if not model_path.exists():
+            raise FileNotFoundError(f"Quantized sentiment model not found at {model_path}")
+
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+
+        self.session = ort.InferenceSession(
+            str(model_path),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+        with open(model_dir / "labels.json", "r", encoding="utf-8") as f:
+            self.id2label = {int(k): v for k, v in json.load(f).items()}
+
+    def __call__(
+        self,
+        texts: Union[str, List[str]],
+        batch_size: int = 8,
+        truncation: bool = True,
+        max_length: int = 512
+    ) -> List[Dict[str, Any]]:
+        """
+        Score texts.
+
+        Returns:
+            One {'label', 'score'} dict per text, like the transformers pipeline
+        """
+        import numpy as np
+
+        if isinstance(texts, str):
+            texts = [texts]
+
+        results = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            encoded = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=truncation,
+                max_length=max_length,
+                return_tensors="np"
+            )
+            (logits,) = self.session.run(
+                ["logits"],
+                {
+                    "input_ids": encoded["input_ids"].astype(np.int64),
+                    "attention_mask": encoded["attention_mask"].astype(np.int64)
+                }
+            )
+            shifted = logits - logits.max(axis=-1, keepdims=True)
+            probs = np.exp(shifted) / np.exp(shifted).sum(axis=-1, keepdims=True)
+            for row in probs:
+                label_id = int(row.argmax())
+                results.append({'label': self.id2label[label_id], 'score': float(row[label_id])})
+        return results
+
+
+def initialize_onnx_pipeline(model_dir: str = DEFAULT_ONNX_DIR):
+    """
+    Load the quantized ONNX sentiment backend.
+
+    Returns:
+        tuple: (analyzer_pipeline, is_enabled, hardware_name)
+    """
+    try:
+        analyzer = OnnxSentimentPipeline(model_dir)
+        logger.info("✅ Sentiment analyzer loaded on CPU (ONNX Runtime int8)")
+        return analyzer, True, "CPU (ONNX int8)"
+    except FileNotFoundError as e:
+        # Exporting here would load torch and the fp32 model into the serving process
+        logger.warning(f"⚠️ {e}")
+        logger.warning(f"💡 Export it offline: python onnx_sentiment.py --export --model-dir {model_dir}")
+        return None, False, "None"
+    except ImportError as e:
+        logger.warning(f"⚠️ ONNX sentiment backend unavailable: {e}")
+        logger.warning("💡 Install: pip install onnxruntime transformers")
+        return None, False, "None"
+    except Exception as e:
+        logger.error(f"❌ Failed to load ONNX sentiment analyzer: {e}")
+        return None, False, "None"
+
+
+def verify_parity(
+    texts: Optional[List[str]] = None,
+    model_dir: str = DEFAULT_ONNX_DIR
+) -> Dict[str, Any]:
+    """
+    Check that the ONNX backend assigns the same labels as PyTorch.
+
+    Args:
+        texts: Captions to compare (SAMPLE_CAPTIONS if None)
+        model_dir: ONNX model directory
+
+    Returns:
+        Agreement rate, maximum score difference and any mismatches
+    """
+    from transformers import pipeline
+
+    texts = texts or SAMPLE_CAPTIONS
+    reference = pipeline("sentiment-analysis", model=SENTIMENT_MODEL_ID, device=-1)
+    onnx = OnnxSentimentPipeline(model_dir)
+
+    expected = reference(texts, truncation=True, max_length=512)
+    actual = onnx(texts)
+
+    mismatches = [
+        {'text': t, 'pytorch': e['label'], 'onnx': a['label']}
+        for t, e, a in zip(texts, expected, actual)
+        if e['label'] != a['label']
+    ]
+    return {
+        'samples': len(texts),
+        'agreement': 1 - len(mismatches) / len(texts),
+        'max_score_diff': max(abs(e['score'] - a['score']) for e, a in zip(expected, actual)),
+        'mismatches': mismatches
+    }
+
+
+def _resident_memory_mb() -> float:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        import resource
+        # Peak RSS; kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def _measure_backend(backend: str, runs: int, model_dir: str) -> Dict[str, Any]:
+    """Load one backend and time it (run in a fresh process for clean memory numbers)"""
+    baseline_mb = _resident_memory_mb()
+    start = time.perf_counter()
+    if backend == "onnx":
+        analyzer = OnnxSentimentPipeline(model_dir)
+    else:
+        from transformers import pipeline
+        analyzer = pipeline("sentiment-analysis", model=SENTIMENT_MODEL_ID, device=-1)
+    load_s = time.perf_counter() - start
+
+    analyzer(SAMPLE_CAPTIONS[:2])  # warm-up
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        analyzer(SAMPLE_CAPTIONS, batch_size=8, truncation=True, max_length=512)
+        latencies.append((time.perf_counter() - start) * 1000 / len(SAMPLE_CAPTIONS))
+
+    latencies.sort()
+    return {
+        'backend': backend,
+        'load_s': load_s,
+        'ms_per_caption_p50': latencies[len(latencies) // 2],
+        'ms_per_caption_p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        'rss_mb': _resident_memory_mb(),
+        'rss_delta_mb': _resident_memory_mb() - baseline_mb
+    }
+
+
+def benchmark_backends(runs: int = 20, model_dir: str = DEFAULT_ONNX_DIR) -> List[Dict[str, Any]]:
+    """
+    Compare PyTorch and ONNX latency and resident memory, each in its own process.
+
+    Returns:
+        One result dict per backend
+    """
+    results = []
+    for backend in ("pytorch", "onnx"):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--measure", backend,
+             "--runs", str(runs), "--model-dir", model_dir],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quantized ONNX sentiment backend tools")
+    parser.add_argument("--export", action="store_true", help="Export and quantize the model")
+    parser.add_argument("--parity", action="store_true", help="Compare labels with PyTorch")
+    parser.add_argument("--benchmark", action="store_true", help="Compare latency and memory")
+    parser.add_argument("--measure", choices=["pytorch", "onnx"], help=argparse.SUPPRESS)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--model-dir", default=DEFAULT_ONNX_DIR)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    if args.measure:
+        print(json.dumps(_measure_backend(args.measure, args.runs, args.model_dir)))
+    if args.export:
+        export_quantized_onnx(args.model_dir)
+    if args.parity:
+        print(json.dumps(verify_parity(model_dir=args.model_dir), indent=2, ensure_ascii=False))
+    if args.benchmark:
+        print(json.dumps(benchmark_backends(args.runs, args.model_dir), indent=2))
@@ -6,11 +6,12 @@ using vector similarity search for consistent, high-quality outputs.
 """
 
 import logging
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from dataclasses import dataclass, replace
 
+from token_budget import TokenBudgeter
 from vector_store import BrandVectorStore, get_vector_store
-from content_generator import ContentRequest, GeneratedPost
+from content_generator import ContentRequest, GeneratedPost, GenerationResult
 
 logger = logging.getLogger(__name__)
 
@@ -21,16 +22,29 @@ class RAGContentPipeline:
     Injects context into prompts for brand-consistent, high-quality content.
     """
     
-    def __init__(self, content_generator, vector_store: Optional[BrandVectorStore] = None):
+    def __init__(
+        self,
+        content_generator,
+        vector_store: Optional[BrandVectorStore] = None,
+        token_budgeter: Optional[TokenBudgeter] = None,
+        max_guideline_tokens: int = 300,
+        num_guidelines: int = 3
+    ):
         """
         Initialize RAG pipeline.
         
         Args:
             content_generator: GeminiContentGenerator instance
             vector_store: BrandVectorStore instance (optional, will create if None)
+            token_budgeter: Caps prompt + context + image input tokens (default budget if None)
+            max_guideline_tokens: Separate cap for brand voice guideline sections (0 disables)
+            num_guidelines: Guideline sections retrieved per request
         """
         self.generator = content_generator
         self.vector_store = vector_store or get_vector_store()
+        self.token_budgeter = token_budgeter or TokenBudgeter()
+        self.guideline_budgeter = TokenBudgeter(max_guideline_tokens) if max_guideline_tokens > 0 else None
+        self.num_guidelines = num_guidelines
         
         if self.vector_store is None:
             logger.warning("⚠️ RAG pipeline initialized without vector store")
@@ -56,45 +70,216 @@ class RAGContentPipeline:
         Returns:
             List of GeneratedPost objects
         """
+        cache = getattr(self.generator, 'cache', None)
+        if cache is None or not self.enabled:
+            return self._generate_with_context_uncached(request, num_examples, use_platform_filter)
+        
+        # Cache hits skip retrieval as well as the API call, so the key pins the
+        # index version; edited brand content must not serve results built from old examples
+        key = self.generator.cache_key(
+            request,
+            namespace=f"rag:{num_examples}:{use_platform_filter}:v{self.vector_store.index_version}"
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            logger.info("⚡ Served RAG generation from response cache")
+            return cached
+        
+        posts = self._try_generate_with_context(request, num_examples, use_platform_filter)
+        if posts is None:
+            # Fallback output is not RAG output; keep it out of the rag: namespace
+            return self.generator.generate(request)
+        
+        # Don't pin partial results or captions whose sentiment is still pending
+        if self.generator.is_cacheable(request, posts):
+            cache.put(key, posts)
+        return posts
+    
+    def _generate_with_context_uncached(
+        self,
+        request: ContentRequest,
+        num_examples: int,
+        use_platform_filter: bool
+    ) -> List[GeneratedPost]:
+        """Retrieve context and generate, bypassing the RAG-level response cache."""
         if not self.enabled or self.vector_store is None:
             # Fallback to regular generation
             logger.info("ℹ️ RAG disabled, using standard generation")
             return self.generator.generate(request)
         
+        posts = self._try_generate_with_context(request, num_examples, use_platform_filter)
+        return posts if posts is not None else self.generator.generate(request)
+    
+    def _try_generate_with_context(
+        self,
+        request: ContentRequest,
+        num_examples: int,
+        use_platform_filter: bool
+    ) -> Optional[List[GeneratedPost]]:
+        """
+        Retrieve context and generate with it.
+        
+        Returns:
+            Generated posts, or None if RAG generation failed and the caller should fall back
+        """
         try:
-            # Retrieve relevant brand examples
-            platform_filter = request.platforms[0] if use_platform_filter and request.platforms else None
-            
-            logger.info(f"🔍 Retrieving {num_examples} similar examples...")
-            similar_examples = self.vector_store.retrieve_similar(
-                query=request.keywords,
-                k=num_examples,
-                filter_platform=platform_filter
-            )
-            
-            if not similar_examples:
-                logger.warning("⚠️ No similar examples found, using standard generation")
-                return self.generator.generate(request)
-            
-            # Enhance request with context
-            enhanced_request = self._enhance_request_with_context(
-                request,
-                similar_examples
-            )
-            
-            # Generate with enhanced prompt
-            logger.info(f"🎯 Generating with {len(similar_examples)} context examples")
-            return self.generator.generate(enhanced_request)
+            context_request = self._build_context_request(request, num_examples, use_platform_filter)
+            return self.generator.generate(context_request)
             
         except Exception as e:
             logger.error(f"❌ RAG generation failed: {e}")
             logger.info("ℹ️ Falling back to standard generation")
-            return self.generator.generate(request)
+            return None
+    
+    def generate_per_platform_with_context(
+        self,
+        request: ContentRequest,
+        num_examples: int = 3,
+        use_platform_filter: bool = True
+    ) -> Dict[str, GenerationResult]:
+        """
+        Generate platform-specific content for every selected platform concurrently.
+        
+        Without the platform filter one retrieval is shared by every platform;
+        with it, all platforms retrieve their own examples in one batched call.
+        
+        Args:
+            request: ContentRequest whose platforms are fanned out
+            num_examples: Number of similar examples to retrieve
+            use_platform_filter: Filter examples by each target platform
+            
+        Returns:
+            Mapping of platform to its GenerationResult, in selection order
+        """
+        if not self.enabled or self.vector_store is None:
+            logger.info("ℹ️ RAG disabled, using standard generation")
+            return self.generator.generate_per_platform(request)
+        
+        shared_request = request
+        if not use_platform_filter:
+            try:
+                shared_request = self._build_context_request(request, num_examples, False)
+            except Exception as e:
+                logger.error(f"❌ RAG retrieval failed: {e}")
+        
+        requests_by_platform = {
+            platform: replace(shared_request, platforms=[platform])
+            for platform in request.platforms
+        }
+        if use_platform_filter:
+            platform_requests = list(requests_by_platform.values())
+            try:
+                contexts = self._retrieve_context(platform_requests, num_examples, True)
+            except Exception as e:
+                logger.error(f"❌ RAG retrieval failed: {e}")
+                contexts = [([], [])] * len(platform_requests)
+            
+            for platform_request, (examples, guidelines) in zip(platform_requests, contexts):
+                platform = platform_request.platforms[0]
+                try:
+                    requests_by_platform[platform] = self._apply_context(platform_request, examples, guidelines)
+                except Exception as e:
+                    logger.error(f"❌ RAG context failed for {platform}: {e}")
+        
+        return self.generator.generate_for_platforms(requests_by_platform)
+    
+    def generate_stream_with_context(
+        self,
+        request: ContentRequest,
+        num_examples: int = 3,
+        use_platform_filter: bool = True
+    ) -> Iterator[GeneratedPost]:
+        """
+        Stream content with retrieved context, yielding posts as they arrive.
+        
+        Args:
+            request: ContentRequest with generation parameters
+            num_examples: Number of similar examples to retrieve
+            use_platform_filter: Filter examples by target platform
+            
+        Yields:
+            GeneratedPost objects in generation order
+        """
+        context_request = request
+        if self.enabled and self.vector_store is not None:
+            try:
+                context_request = self._build_context_request(request, num_examples, use_platform_filter)
+            except Exception as e:
+                logger.error(f"❌ RAG retrieval failed: {e}")
+                logger.info("ℹ️ Falling back to standard generation")
+        
+        yield from self.generator.generate_stream(context_request)
+    
+    def _build_context_request(
+        self,
+        request: ContentRequest,
+        num_examples: int,
+        use_platform_filter: bool
+    ) -> ContentRequest:
+        """
+        Retrieve similar brand examples and guideline sections and inject them into the request.
+        
+        Returns:
+            Enhanced ContentRequest, or the original if nothing was retrieved
+        """
+        examples, guidelines = self._retrieve_context([request], num_examples, use_platform_filter)[0]
+        return self._apply_context(request, examples, guidelines)
+    
+    def _retrieve_context(
+        self,
+        requests: List[ContentRequest],
+        num_examples: int,
+        use_platform_filter: bool
+    ) -> List[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """
+        Retrieve brand examples and guideline sections for several requests in one batch.
+        
+        Returns:
+            (similar examples, guideline sections) per request, in order
+        """
+        filters = [
+            r.platforms[0] if use_platform_filter and r.platforms else None
+            for r in requests
+        ]
+        
+        logger.info(f"🔍 Retrieving {num_examples} similar examples for {len(requests)} request(s)...")
+        examples = self.vector_store.retrieve_similar_batch(
+            [r.keywords for r in requests],
+            k=num_examples,
+            filters=filters
+        )
+        
+        guidelines = [[] for _ in requests]
+        if self.guideline_budgeter is not None:
+            # Platform names pull in their platform-specific sections
+            guidelines = self.vector_store.retrieve_guidelines_batch(
+                [" ".join([r.keywords, *r.platforms]) for r in requests],
+                k=self.num_guidelines
+            )
+        return list(zip(examples, guidelines))
+    
+    def _apply_context(
+        self,
+        request: ContentRequest,
+        similar_examples: List[Dict[str, Any]],
+        guidelines: List[Dict[str, Any]]
+    ) -> ContentRequest:
+        """Inject retrieved context, or return the original request if nothing was retrieved."""
+        if not similar_examples and not guidelines:
+            logger.warning("⚠️ No similar examples found, using standard generation")
+            return request
+        
+        logger.info(
+            f"🎯 Generating with {len(similar_examples)} context examples "
+            f"and {len(guidelines)} guideline sections"
+        )
+        return self._enhance_request_with_context(request, similar_examples, guidelines)
     
     def _enhance_request_with_context(
         self,
         request: ContentRequest,
-        examples: List[Dict[str, Any]]
+        examples: List[Dict[str, Any]],
+        guidelines: Optional[List[Dict[str, Any]]] = None
     ) -> ContentRequest:
         """
         Enhance content request with retrieved context.
@@ -102,21 +287,44 @@ class RAGContentPipeline:
         Args:
             request: Original ContentRequest
             examples: Retrieved similar examples
+            guidelines: Retrieved brand voice guideline sections
             
         Returns:
             Enhanced ContentRequest with context
         """
+        # Guidelines have their own cap so they stay small however long brand_voice.txt gets
+        guidelines_text = ""
+        if guidelines and self.guideline_budgeter is not None:
+            fitted, _ = self.guideline_budgeter.fit_examples(
+                [dict(g, caption=g['content']) for g in guidelines],
+                self._format_guidelines,
+                prompt_tokens=0
+            )
+            guidelines_text = self._format_guidelines(fitted)
+        
+        # Budget the examples against the prompt, guidelines and image they will travel with
+        base_tokens = self.generator.estimate_input_tokens(
+            replace(request, keywords=self._context_keywords(request.keywords, "", guidelines_text))
+        )
+        examples, report = self.token_budgeter.fit_examples(
+            examples,
+            self._format_context,
+            prompt_tokens=base_tokens['prompt_tokens'],
+            image_tokens=base_tokens['image_tokens']
+        )
+        logger.info(
+            f"📏 Estimated input: ~{report.total_tokens} tokens (prompt {report.prompt_tokens}, "
+            f"context {report.context_tokens}, image {report.image_tokens}; budget {report.budget})"
+        )
+        if not examples and not guidelines_text:
+            logger.warning("⚠️ No examples fit the token budget, using standard generation")
+            return request
+        
         # Build context section from examples
         context_text = self._format_context(examples)
         
         # Enhance keywords with context
-        enhanced_keywords = f"""{request.keywords}
-
-BRAND CONTEXT (Follow these examples):
-{context_text}
-
-Generate content that matches the style, tone, and quality of the examples above.
-"""
+        enhanced_keywords = self._context_keywords(request.keywords, context_text, guidelines_text)
         
         # Create enhanced request
         enhanced_request = ContentRequest(
@@ -130,6 +338,41 @@ Generate content that matches the style, tone, and quality of the examples above
         
         return enhanced_request
     
+    @staticmethod
+    def _context_keywords(keywords: str, context_text: str, guidelines_text: str = "") -> str:
+        guidelines_block = f"""
+BRAND GUIDELINES (Relevant sections):
+{guidelines_text}
+""" if guidelines_text else ""
+        if not context_text and guidelines_text:
+            return f"""{keywords}
+{guidelines_block}
+Generate content that follows the brand guidelines above.
+"""
+        return f"""{keywords}
+{guidelines_block}
+BRAND CONTEXT (Follow these examples):
+{context_text}
+
+Generate content that matches the style, tone, and quality of the examples above.
+"""
+    
+    @staticmethod
+    def _format_guidelines(sections: List[Dict[str, Any]]) -> str:
+        """
+        Format guideline sections into a compact block.
+        
+        Args:
+            sections: Sections with 'section' (heading path) and 'caption' (possibly truncated text)
+            
+        Returns:
+            Formatted guidelines string
+        """
+        return "\n\n".join(
+            f"[{section['section']}]\n{section.get('caption', section.get('content', ''))}"
+            for section in sections
+        )
+    
     def _format_context(self, examples: List[Dict[str, Any]]) -> str:
         """
         Format retrieved examples into context string.
@@ -162,7 +405,9 @@ Hashtags: {' '.join(hashtags) if hashtags else 'N/A'}
         """Get RAG pipeline statistics"""
         stats = {
             'enabled': self.enabled,
-            'vector_store_loaded': self.vector_store is not None
+            'vector_store_loaded': self.vector_store is not None,
+            'max_input_tokens': self.token_budgeter.max_input_tokens,
+            'max_guideline_tokens': self.guideline_budgeter.max_input_tokens if self.guideline_budgeter else 0
         }
         
         if self.vector_store:
@@ -171,24 +416,43 @@ Hashtags: {' '.join(hashtags) if hashtags else 'N/A'}
         return stats
 
 
-def create_rag_pipeline(content_generator, enable_rag: bool = True) -> RAGContentPipeline:
+def create_rag_pipeline(
+    content_generator,
+    enable_rag: bool = True,
+    max_input_tokens: int = 4000,
+    cache_dir: str = "",
+    max_guideline_tokens: int = 300
+) -> RAGContentPipeline:
     """
     Factory function to create RAG pipeline.
     
     Args:
         content_generator: GeminiContentGenerator instance
         enable_rag: Whether to enable RAG
+        max_input_tokens: Input-token budget for prompt, brand context and image
+        cache_dir: Directory for persistent retrieval caches (empty disables)
+        max_guideline_tokens: Separate budget for brand voice guideline sections
         
     Returns:
         RAGContentPipeline instance
     """
     if not enable_rag:
         logger.info("ℹ️ RAG disabled by user preference")
-        return RAGContentPipeline(content_generator, vector_store=None)
+        return RAGContentPipeline(
+            content_generator,
+            vector_store=None,
+            token_budgeter=TokenBudgeter(max_input_tokens),
+            max_guideline_tokens=max_guideline_tokens
+        )
     
     try:
-        vector_store = get_vector_store()
-        pipeline = RAGContentPipeline(content_generator, vector_store)
+        vector_store = get_vector_store(cache_dir=cache_dir)
+        pipeline = RAGContentPipeline(
+            content_generator,
+            vector_store,
+            TokenBudgeter(max_input_tokens),
+            max_guideline_tokens=max_guideline_tokens
+        )
         
         if pipeline.enabled:
             logger.info("✅ RAG pipeline created successfully")
@@ -200,4 +464,9 @@ def create_rag_pipeline(content_generator, enable_rag: bool = True) -> RAGConten
     except Exception as e:
         logger.error(f"❌ Failed to create RAG pipeline: {e}")
         logger.info("ℹ️ Creating pipeline without RAG")
-        return RAGContentPipeline(content_generator, vector_store=None)
+        return RAGContentPipeline(
+            content_generator,
+            vector_store=None,
+            token_budgeter=TokenBudgeter(max_input_tokens),
+            max_guideline_tokens=max_guideline_tokens
+        )
@@ -0,0 +1,281 @@
+"""
+Generation Response Cache
+
+Caches generated posts keyed by a canonical hash of the ContentRequest so
+identical requests are served locally instead of hitting the paid Gemini
+API again. Provides an in-process LRU tier with TTL and a byte-size cap,
+plus an optional SQLite tier that survives restarts.
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TTLLRUCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and a total size cap.
+    """
+
+    def __init__(self, max_bytes: int = 50 * 1024 * 1024, ttl_seconds: Optional[float] = 3600.0):
+        """
+        Initialize cache.
+
+        Args:
+            max_bytes: Maximum total size of stored values
+            ttl_seconds: Entry lifetime in seconds (None for no expiry)
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, _ = entry
+            if expires_at and expires_at < time.time():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: Optional[float] = None,
+        size: Optional[int] = None
+    ) -> None:
+        """
+        Store a value, evicting least recently used entries to fit the size cap.
+
+        Args:
+            key: Cache key
+            value: Bytes, or any object when size is given
+            ttl_seconds: Override of the default TTL
+            size: Accounted size in bytes (default: len(value))
+        """
+        size = len(value) if size is None else size
+        if size > self.max_bytes:
+            return
+
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.time() + ttl if ttl else 0.0
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size)
+            self._size += size
+
+            while self._size > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._size -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+class DiskCache:
+    """
+    Persistent key/value tier backed by a single SQLite file.
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None):
+        """
+        Initialize disk cache.
+
+        Args:
+            path: SQLite database file (parent directories are created)
+            ttl_seconds: Entry lifetime in seconds (None for no expiry)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the stored value, or None if missing or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = row
+            if expires_at and expires_at < time.time():
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return bytes(value)
+
+    def put(self, key: str, value: bytes) -> None:
+        """Store a value, replacing any previous entry"""
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else 0.0
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get disk tier counters"""
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        return {
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'path': str(self.path)
+        }
+
+
+def make_request_key(request, model: str, temperature: float, namespace: str = "") -> str:
+    """
+    Build a canonical hash for a ContentRequest.
+
+    Args:
+        request: ContentRequest to hash
+        model: Gemini model id
+        temperature: Sampling temperature
+        namespace: Extra discriminator (e.g. RAG settings)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    image_digest = hashlib.sha256(request.image_data).hexdigest() if request.image_data else None
+    canonical = {
+        'keywords': request.keywords.strip(),
+        'post_type': request.post_type,
+        'platforms': sorted(request.platforms or []),
+        'num_generations': request.num_generations,
+        'image': image_digest,
+        'image_mime_type': request.image_mime_type if image_digest else None,
+        'temperature': round(float(temperature), 4),
+        'model': model,
+        'namespace': namespace
+    }
+    encoded = json.dumps(canonical, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class GenerationCache:
+    """
+    Two-tier cache of generated posts (memory LRU, optional disk).
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 50 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 3600.0,
+        disk_path: Optional[str] = None
+    ):
+        """
+        Initialize generation cache.
+
+        Args:
+            max_bytes: Size cap of the in-process tier
+            ttl_seconds: Entry lifetime in seconds (None for no expiry)
+            disk_path: SQLite file for the persistent tier (None to disable)
+        """
+        self.memory = TTLLRUCache(max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+        self.disk = DiskCache(disk_path, ttl_seconds=ttl_seconds) if disk_path else None
+
+    def get(self, key: str) -> Optional[List[Any]]:
+        """
+        Look up cached posts.
+
+        Returns:
+            Fresh list of GeneratedPost objects, or None on a miss
+        """
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            try:
+                value = self.disk.get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Disk cache read failed: {e}")
+            if value is not None:
+                self.memory.put(key, value)
+
+        if value is None:
+            return None
+
+        from content_generator import GeneratedPost
+        return [GeneratedPost(**item) for item in json.loads(value.decode("utf-8"))]
+
+    def put(self, key: str, posts: List[Any]) -> None:
+        """Store generated posts in every tier"""
+        value = json.dumps([asdict(p) for p in posts], ensure_ascii=False).encode("utf-8")
+        self.memory.put(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.put(key, value)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Disk cache write failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters for every tier"""
+        stats = {'memory': self.memory.get_stats()}
+        if self.disk is not None:
+            stats['disk'] = self.disk.get_stats()
+        return stats
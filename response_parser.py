@@ -0,0 +1,270 @@
+"""
+Gemini Response Parsing
+
+Fast, fault-tolerant parsing of the JSON array of posts returned by Gemini.
+Complete post objects are recovered from truncated or malformed output
+(including single-quoted pseudo-JSON), blocked responses are detected from
+``finishReason``/``promptFeedback``, and the same scanner delivers posts
+incrementally from the streamGenerateContent server-sent events (SSE).
+"""
+
+import ast
+import re
+import json
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from dataclasses import dataclass, field
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+# Finish reasons that mean the model refused rather than ran out of room
+BLOCKED_FINISH_REASONS = frozenset({
+    "SAFETY", "RECITATION", "BLOCKLIST", "PROHIBITED_CONTENT", "SPII"
+})
+
+_CODE_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+
+# A quoted string (left untouched) or a bare JSON literal outside any string
+_JSON_LITERAL = re.compile(
+    r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|\b(true|false|null)\b'
+)
+_PYTHON_LITERALS = {"true": "True", "false": "False", "null": "None"}
+
+
+@dataclass
+class ParseResult:
+    """Outcome of parsing one model response"""
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    salvaged: bool = False
+    finish_reason: Optional[str] = None
+    block_reason: Optional[str] = None
+
+    @property
+    def blocked(self) -> bool:
+        return self.block_reason is not None
+
+
+class IncrementalJSONArrayParser:
+    """
+    Extracts complete outermost objects from JSON text fed in arbitrary chunks.
+
+    Objects are emitted whether they sit in a top-level array, stand alone,
+    or follow a truncated/garbled prefix. Both double- and single-quoted
+    strings are tracked so braces inside captions are ignored.
+
+    Example:
+        parser = IncrementalJSONArrayParser()
+        parser.feed('[{"caption": "Hi"}, {"capt')   # -> [{'caption': 'Hi'}]
+        parser.feed('ion": "There"}]')              # -> [{'caption': 'There'}]
+    """
+
+    def __init__(self):
+        self._objects_open = 0
+        self._quote: Optional[str] = None
+        self._escape = False
+        self._object_start: Optional[int] = None
+        self._position = 0
+        self._text = ""
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume more text.
+
+        Args:
+            chunk: Next piece of the model's output
+
+        Returns:
+            Objects completed by this chunk, in order
+        """
+        self._text += chunk
+        completed = []
+
+        for i in range(self._position, len(self._text)):
+            char = self._text[i]
+
+            if self._quote is not None:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == self._quote:
+                    self._quote = None
+                continue
+
+            if char in "\"'" and self._objects_open:
+                self._quote = char
+            elif char == "{":
+                if self._objects_open == 0:
+                    self._object_start = i
+                self._objects_open += 1
+            elif char == "}" and self._objects_open:
+                self._objects_open -= 1
+                if self._objects_open == 0 and self._object_start is not None:
+                    completed.extend(unwrap_posts(decode_object(self._text[self._object_start:i + 1])))
+                    self._object_start = None
+
+        self._position = len(self._text)
+
+        # Drop consumed text so long streams don't grow the buffer
+        if self._object_start is None:
+            self._text = ""
+            self._position = 0
+        elif self._object_start > 0:
+            self._text = self._text[self._object_start:]
+            self._position -= self._object_start
+            self._object_start = 0
+
+        return completed
+
+
+def decode_object(fragment: str) -> Optional[Any]:
+    """
+    Decode one JSON object, tolerating Python-style single-quoted literals.
+
+    Only true/false/null outside string literals are rewritten, so caption
+    text is returned exactly as the model wrote it:
+
+    >>> decode_object("{'caption': 'This is true love, null and void', 'ok': true}")
+    {'caption': 'This is true love, null and void', 'ok': True}
+
+    Returns:
+        Decoded value, or None if the fragment cannot be repaired
+    """
+    try:
+        return _loads(fragment)
+    except ValueError:
+        pass
+
+    # Single-quoted pseudo-JSON, as shown in our own prompt example
+    literal = _JSON_LITERAL.sub(
+        lambda m: _PYTHON_LITERALS[m.group(1)] if m.group(1) else m.group(0),
+        fragment
+    )
+    try:
+        return ast.literal_eval(literal)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        logger.warning("⚠️ Skipping malformed post object")
+        return None
+
+
+def unwrap_posts(value: Any) -> List[Dict[str, Any]]:
+    """
+    Normalize decoded output into a list of post dicts.
+
+    Accepts a list of posts, a single post, or a wrapper object such as
+    ``{"posts": [...]}``.
+    """
+    if isinstance(value, list):
+        return [item for item in value if isinstance(item, dict)]
+    if not isinstance(value, dict):
+        return []
+    if "caption" in value:
+        return [value]
+    for nested in value.values():
+        if isinstance(nested, list) and nested and all(isinstance(item, dict) for item in nested):
+            return nested
+    return []
+
+
+def parse_posts(text: str) -> ParseResult:
+    """
+    Parse model text into post dicts, salvaging complete objects on failure.
+
+    Args:
+        text: Candidate text produced by the model
+
+    Returns:
+        ParseResult with the recovered items
+    """
+    text = _CODE_FENCE.sub("", text.strip())
+    if not text:
+        return ParseResult()
+
+    try:
+        return ParseResult(items=unwrap_posts(_loads(text)))
+    except ValueError:
+        pass
+
+    items = IncrementalJSONArrayParser().feed(text)
+    logger.warning(f"🩹 Salvaged {len(items)} post(s) from malformed model output")
+    return ParseResult(items=items, salvaged=True)
+
+
+def parse_generation_response(response_data: Dict[str, Any]) -> ParseResult:
+    """
+    Parse a generateContent response body.
+
+    Args:
+        response_data: Decoded JSON body
+
+    Returns:
+        ParseResult including finish/block reasons
+    """
+    block_reason = (response_data.get("promptFeedback") or {}).get("blockReason")
+    finish_reason = get_finish_reason(response_data)
+    result = parse_posts(extract_candidate_text(response_data))
+    result.finish_reason = finish_reason
+
+    if block_reason or (finish_reason in BLOCKED_FINISH_REASONS and not result.items):
+        result.block_reason = block_reason or finish_reason
+    return result
+
+
+def loads(data: Any) -> Any:
+    """Decode JSON bytes or text with the fastest available library"""
+    return _loads(data)
+
+
+def iter_sse_data(lines: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Decode server-sent events into JSON payloads.
+
+    Args:
+        lines: Raw lines (bytes or str) from an SSE response
+
+    Yields:
+        Parsed JSON object from each ``data:`` event
+    """
+    data_lines: List[str] = []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.rstrip("\r")
+
+        if not line:
+            if data_lines:
+                yield _loads("\n".join(data_lines))
+                data_lines = []
+            continue
+
+        if line.startswith("data:"):
+            data_lines.append(line[5:].lstrip())
+
+    if data_lines:
+        yield _loads("\n".join(data_lines))
+
+
+def get_finish_reason(response_data: Dict[str, Any]) -> Optional[str]:
+    """Finish reason of the first candidate, if any"""
+    candidates = response_data.get("candidates") or []
+    return candidates[0].get("finishReason") if candidates else None
+
+
+def extract_candidate_text(response_data: Dict[str, Any]) -> str:
+    """
+    Concatenate the text parts of the first candidate.
+
+    Returns:
+        Candidate text, or an empty string if the chunk carries none
+    """
+    candidates = response_data.get("candidates") or []
+    if not candidates:
+        return ""
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(part.get("text", "") for part in parts)
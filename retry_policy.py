@@ -0,0 +1,202 @@
+"""
+Retry Policy for Gemini API Calls
+
+Retries transient failures (429, 5xx, connection errors and timeouts) with
+capped exponential backoff, full jitter and Retry-After support, all within
+an overall deadline so retries never exceed the user-facing latency budget.
+"""
+
+import time
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, FrozenSet, List, Optional
+from dataclasses import dataclass, field
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retry settings.
+
+    Attributes:
+        max_attempts: Total attempts including the first one
+        base_delay: Backoff base in seconds
+        max_delay: Upper bound on any single backoff in seconds
+        deadline: Overall budget in seconds for all attempts and waits
+        retry_statuses: HTTP status codes considered transient
+        respect_retry_after: Honour the server's Retry-After header
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    deadline: float = 45.0
+    retry_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+    respect_retry_after: bool = True
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Delay before the next attempt.
+
+        Args:
+            attempt: Number of attempts made so far (1-based)
+            retry_after: Server-provided delay in seconds, if any
+
+        Returns:
+            Seconds to wait
+        """
+        # Full jitter: uniform over [0, min(cap, base * 2^n)]
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+        if self.respect_retry_after and retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+@dataclass
+class AttemptRecord:
+    """Metrics for a single API attempt"""
+    attempt: int
+    latency_ms: float
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    retried: bool = False
+    delay_s: float = 0.0
+
+
+@dataclass
+class RetryStats:
+    """Aggregate retry counters with an optional per-attempt hook"""
+    calls: int = 0
+    attempts: int = 0
+    retries: int = 0
+    recovered: int = 0
+    exhausted: int = 0
+    on_attempt: Optional[Callable[[AttemptRecord], None]] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, record: AttemptRecord) -> None:
+        with self._lock:
+            self.attempts += 1
+            if record.retried:
+                self.retries += 1
+        if self.on_attempt is not None:
+            try:
+                self.on_attempt(record)
+            except Exception as e:
+                logger.warning(f"⚠️ Retry metrics hook failed: {e}")
+
+    def finish(self, attempts: List[AttemptRecord], succeeded: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            if succeeded and len(attempts) > 1:
+                self.recovered += 1
+            if not succeeded:
+                self.exhausted += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'attempts': self.attempts,
+                'retries': self.retries,
+                'recovered': self.recovered,
+                'exhausted': self.exhausted
+            }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP-date).
+
+    Returns:
+        Seconds to wait, or None if absent or malformed
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_retry(
+    send: Callable[[float], Any],
+    policy: RetryPolicy,
+    stats: Optional[RetryStats] = None
+):
+    """
+    Call send() until it returns a non-transient response or the policy gives up.
+
+    Args:
+        send: Function taking the remaining deadline in seconds and returning a response
+        policy: Retry settings
+        stats: Optional counters updated per attempt
+
+    Returns:
+        The last response (which may still carry a transient status)
+
+    Raises:
+        requests.exceptions.ConnectionError / Timeout: If the last attempt failed in transport
+    """
+    deadline = time.monotonic() + policy.deadline
+    attempts: List[AttemptRecord] = []
+    attempt = 0
+
+    while True:
+        attempt += 1
+        remaining = deadline - time.monotonic()
+        start = time.perf_counter()
+        response, error = None, None
+        try:
+            response = send(remaining)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            error = e
+
+        record = AttemptRecord(
+            attempt=attempt,
+            latency_ms=(time.perf_counter() - start) * 1000,
+            status_code=getattr(response, 'status_code', None),
+            error=type(error).__name__ if error else None
+        )
+
+        transient = error is not None or response.status_code in policy.retry_statuses
+        delay = 0.0
+        if transient and attempt < policy.max_attempts:
+            retry_after = None
+            if response is not None:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            delay = policy.backoff(attempt, retry_after)
+            # Only retry if the wait plus a useful attempt still fits the budget
+            record.retried = time.monotonic() + delay < deadline - 1.0
+            record.delay_s = delay if record.retried else 0.0
+
+        attempts.append(record)
+        if stats is not None:
+            stats.record(record)
+
+        if not record.retried:
+            if stats is not None:
+                stats.finish(attempts, succeeded=not transient)
+            if error is not None:
+                raise error
+            return response
+
+        # Release the connection of a discarded (possibly streaming) response
+        if response is not None and hasattr(response, "close"):
+            response.close()
+
+        logger.warning(
+            f"🔁 Attempt {attempt} failed ({record.status_code or record.error}), "
+            f"retrying in {delay:.2f}s"
+        )
+        time.sleep(delay)
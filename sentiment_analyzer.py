@@ -0,0 +1,252 @@
+"""
+Sentiment Analyzer Lifecycle
+
+Loads the DistilBERT sentiment pipeline lazily, optionally on a background
+thread, so importing the generation modules never pulls in torch or
+transformers. Callers can query readiness and receive a "Pending" label
+until the model is available.
+"""
+
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from response_cache import DiskCache, TTLLRUCache
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_MODEL_ID = "distilbert-base-uncased-finetuned-sst-2-english"
+
+# Readiness states
+STATE_NOT_LOADED = "not_loaded"
+STATE_LOADING = "loading"
+STATE_READY = "ready"
+STATE_DISABLED = "disabled"
+
+SENTIMENT_PENDING = "Pending"
+
+
+def initialize_gpu_pipeline():
+    """
+    Load sentiment analysis model onto GPU if available.
+
+    Returns:
+        tuple: (analyzer_pipeline, is_enabled, gpu_hardware_name)
+    """
+    try:
+        from transformers import pipeline
+        import torch
+
+        # device=0 specifically targets your RTX card
+        device = 0 if torch.cuda.is_available() else -1
+
+        logger.info(f"🚀 Initializing GPU pipeline...")
+        logger.info(f"CUDA Available: {torch.cuda.is_available()}")
+
+        if device == 0:
+            gpu_name = torch.cuda.get_device_name(0)
+            logger.info(f"🎯 Targeting GPU: {gpu_name}")
+        else:
+            gpu_name = "CPU"
+            logger.warning("⚠️ No GPU detected, using CPU")
+
+        # Load model with explicit device assignment
+        analyzer = pipeline(
+            "sentiment-analysis",
+            device=device,
+            model=SENTIMENT_MODEL_ID  # Explicit model for consistency
+        )
+
+        logger.info(f"✅ Sentiment analyzer loaded successfully on {gpu_name}")
+        logger.info(f"🎯 Model will remain in {'VRAM' if device == 0 else 'RAM'} for fast inference")
+
+        return analyzer, True, gpu_name
+
+    except ImportError as e:
+        logger.warning(f"⚠️ Sentiment analysis disabled: {e}")
+        logger.warning("💡 Install 'transformers' and 'torch' to enable GPU acceleration")
+        logger.warning("💡 Run: pip install torch transformers")
+        return None, False, "None"
+    except Exception as e:
+        logger.error(f"❌ Failed to load sentiment analyzer: {e}")
+        return None, False, "None"
+
+
+class SentimentModel:
+    """
+    Process-wide holder for the sentiment pipeline and its readiness state.
+    """
+
+    def __init__(self, backend: str = "pytorch", onnx_model_dir: Optional[str] = None):
+        self.backend = backend
+        self.onnx_model_dir = onnx_model_dir
+        self._lock = threading.Lock()
+        self._ready_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.state = STATE_NOT_LOADED
+        self.analyzer = None
+        self.hardware = "None"
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == STATE_READY
+
+    @property
+    def is_enabled(self) -> bool:
+        """False only once loading has failed or dependencies are missing"""
+        return self.state != STATE_DISABLED
+
+    def configure(self, backend: str = "pytorch", onnx_model_dir: Optional[str] = None) -> None:
+        """
+        Select the inference backend before the model is loaded.
+
+        Args:
+            backend: "pytorch" (transformers pipeline) or "onnx" (quantized ONNX Runtime)
+            onnx_model_dir: Directory for the exported ONNX model
+        """
+        if backend not in ("pytorch", "onnx"):
+            raise ValueError(f"Unknown sentiment backend: {backend}")
+        with self._lock:
+            if self.state != STATE_NOT_LOADED:
+                if backend != self.backend:
+                    logger.warning("⚠️ Sentiment backend change ignored (model already loading)")
+                return
+            self.backend = backend
+            self.onnx_model_dir = onnx_model_dir
+
+    def start_warmup(self) -> None:
+        """Begin loading the model on a background thread (no-op if already started)"""
+        with self._lock:
+            if self.state != STATE_NOT_LOADED:
+                return
+            self.state = STATE_LOADING
+            self._thread = threading.Thread(
+                target=self._load,
+                name="sentiment-warmup",
+                daemon=True
+            )
+            self._thread.start()
+        logger.info("🔥 Warming up sentiment model in the background")
+
+    def _load(self) -> None:
+        analyzer, enabled = None, False
+        if self.backend == "onnx":
+            from onnx_sentiment import DEFAULT_ONNX_DIR, initialize_onnx_pipeline
+            analyzer, enabled, hardware = initialize_onnx_pipeline(self.onnx_model_dir or DEFAULT_ONNX_DIR)
+            if not enabled:
+                logger.info("ℹ️ Falling back to the PyTorch sentiment backend")
+                self.backend = "pytorch"
+        if not enabled:
+            analyzer, enabled, hardware = initialize_gpu_pipeline()
+        with self._lock:
+            self.analyzer = analyzer
+            self.hardware = hardware
+            self.state = STATE_READY if enabled else STATE_DISABLED
+        self._ready_event.set()
+
+        if enabled:
+            logger.info(f"🔥 GPU-accelerated sentiment analysis is READY on {hardware}!")
+        else:
+            logger.info("ℹ️ Sentiment analysis is disabled - check environment and dependencies")
+
+    def get(self, wait: bool = False, timeout: Optional[float] = None):
+        """
+        Get the loaded pipeline, starting a background load on first use.
+
+        Args:
+            wait: Block until loading finishes
+            timeout: Maximum seconds to wait when wait is True
+
+        Returns:
+            Sentiment pipeline, or None if not ready or disabled
+        """
+        self.start_warmup()
+        if wait:
+            self._ready_event.wait(timeout)
+        return self.analyzer if self.state == STATE_READY else None
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get readiness state for display"""
+        return {
+            'state': self.state,
+            'hardware': self.hardware,
+            'backend': self.backend,
+            'model': SENTIMENT_MODEL_ID
+        }
+
+    @property
+    def cache_id(self) -> str:
+        """Model identity used in sentiment cache keys (backends score slightly differently)"""
+        return f"{SENTIMENT_MODEL_ID}:{self.backend}"
+
+
+class SentimentCache:
+    """
+    Content-addressed cache of sentiment labels keyed by caption text and model id.
+    """
+
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024, disk_path: Optional[str] = None):
+        """
+        Initialize sentiment cache.
+
+        Args:
+            max_bytes: Size cap of the in-process tier
+            disk_path: SQLite file for the persistent tier (None to disable)
+        """
+        self.memory = TTLLRUCache(max_bytes=max_bytes, ttl_seconds=None)
+        self.disk = DiskCache(disk_path) if disk_path else None
+
+    @staticmethod
+    def make_key(text: str, model_id: str) -> str:
+        return hashlib.sha256(f"{model_id}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: List[str], model_id: str) -> List[Optional[str]]:
+        """
+        Look up labels for many captions.
+
+        Returns:
+            Cached label per text, or None for misses
+        """
+        labels = []
+        for text in texts:
+            key = self.make_key(text, model_id)
+            value = self.memory.get(key)
+            if value is None and self.disk is not None:
+                try:
+                    value = self.disk.get(key)
+                except sqlite3.Error as e:
+                    # A locked or corrupt file just means re-scoring
+                    logger.warning(f"⚠️ Sentiment disk cache read failed: {e}")
+                if value is not None:
+                    self.memory.put(key, value)
+            labels.append(value.decode("utf-8") if value is not None else None)
+        return labels
+
+    def put_many(self, texts: List[str], labels: List[str], model_id: str) -> None:
+        """Store labels for captions"""
+        for text, label in zip(texts, labels):
+            key = self.make_key(text, model_id)
+            value = label.encode("utf-8")
+            self.memory.put(key, value, size=len(value) + len(key))
+            if self.disk is not None:
+                try:
+                    self.disk.put(key, value)
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ Sentiment disk cache write failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit-rate counters for every tier"""
+        stats = {'memory': self.memory.get_stats()}
+        if self.disk is not None:
+            stats['disk'] = self.disk.get_stats()
+        return stats
+
+
+_SENTIMENT_MODEL = SentimentModel()
+
+
+def get_sentiment_model() -> SentimentModel:
+    """Get the process-wide sentiment model holder"""
+    return _SENTIMENT_MODEL
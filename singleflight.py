@@ -0,0 +1,138 @@
+"""
+Single-Flight Request Coalescing
+
+Concurrent callers asking for the same key wait on one in-flight call and
+share its result, so a double-clicked button or several sessions submitting
+the same request trigger only one Gemini API call.
+"""
+
+import copy
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """One in-flight call and the callers waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.abandoned = False
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share a key.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn() once per key among concurrent callers.
+
+        Args:
+            key: Canonical request hash
+            fn: Function producing the result
+
+        Returns:
+            The result of fn(); waiters receive a deep copy
+
+        Raises:
+            Whatever fn() raised, re-raised in every waiting caller
+        """
+        leader, call = self.acquire(key)
+        if not leader:
+            result = self.wait(call)
+            # The leader was a stream its consumer stopped reading; produce our own result
+            return fn() if call.abandoned else result
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self.release(key, call, error=e)
+            raise
+        self.release(key, call, result=result)
+        return result
+
+    def acquire(self, key: str) -> Tuple[bool, _Call]:
+        """
+        Join the in-flight call for key, or become its leader.
+
+        For leaders that cannot wrap their work in one function, such as a
+        streaming generator; they must call release() exactly once.
+
+        Returns:
+            (True if the caller leads and must produce the result, the call)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                return False, call
+            call = _Call()
+            self._calls[key] = call
+            self.executed += 1
+            return True, call
+
+    def wait(self, call: _Call) -> Any:
+        """
+        Wait for a call led by another caller.
+
+        Returns:
+            Deep copy of the leader's result (None if the leader abandoned it)
+
+        Raises:
+            Whatever the leader's work raised
+        """
+        logger.info("🔗 Coalesced with an identical in-flight request")
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return copy.deepcopy(call.result)
+
+    def release(
+        self,
+        key: str,
+        call: _Call,
+        result: Any = None,
+        error: Optional[BaseException] = None,
+        abandoned: bool = False
+    ) -> None:
+        """
+        Publish the leader's outcome and wake every waiter.
+
+        Args:
+            key: Key passed to acquire()
+            call: Call returned by acquire()
+            result: Leader's result
+            error: Leader's exception, re-raised in every waiter
+            abandoned: Leader stopped without a result; waiters should do the work themselves
+        """
+        call.result = result
+        call.error = error
+        call.abandoned = abandoned
+        with self._lock:
+            self._calls.pop(key, None)
+        call.done.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing counters"""
+        with self._lock:
+            total = self.executed + self.coalesced
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+                'coalesce_rate': self.coalesced / total if total else 0.0
+            }
@@ -0,0 +1,197 @@
+"""
+Input Token Estimation and Budgeting
+
+Estimates Gemini input tokens locally (no API round-trip) and fits the
+prompt, retrieved brand examples and image under an input-token budget by
+dropping or truncating the lowest-similarity examples first.
+"""
+
+import io
+import math
+import re
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# Gemini bills images up to 384px per side as one 258-token tile,
+# larger images as 768x768 tiles of 258 tokens each
+IMAGE_TILE_TOKENS = 258
+IMAGE_SMALL_SIDE = 384
+IMAGE_TILE_SIDE = 768
+
+# Don't keep a truncated example shorter than this
+MIN_TRUNCATED_TOKENS = 16
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of input tokens in text.
+
+    Words count as one token per ~4 characters (SentencePiece splits long
+    words), and punctuation and emoji count as one token each.
+
+    Args:
+        text: Prompt text
+
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+    return sum(
+        math.ceil(len(piece) / 4) if piece[0].isalnum() or piece[0] == "_" else 1
+        for piece in _TOKEN_PATTERN.findall(text)
+    )
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text at a word boundary so it fits within max_tokens.
+
+    Returns:
+        The text itself if it already fits, otherwise a prefix ending in "…"
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    used = 0
+    end = 0
+    for match in _TOKEN_PATTERN.finditer(text):
+        cost = estimate_tokens(match.group())
+        # Reserve one token for the ellipsis
+        if used + cost > max_tokens - 1:
+            break
+        used += cost
+        end = match.end()
+    return text[:end].rstrip() + "…"
+
+
+def estimate_image_tokens(
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    data: Optional[bytes] = None
+) -> int:
+    """
+    Estimate the input tokens Gemini charges for an image.
+
+    Args:
+        width: Image width in pixels, if known
+        height: Image height in pixels, if known
+        data: Encoded image, used to read the size when width/height are unknown
+
+    Returns:
+        Estimated token count (0 if there is no image)
+    """
+    if (width is None or height is None) and data:
+        try:
+            from PIL import Image
+            with Image.open(io.BytesIO(data)) as img:
+                width, height = img.size
+        except Exception:
+            # Unknown size: assume a typical photo of four tiles
+            return 4 * IMAGE_TILE_TOKENS
+    if not width or not height:
+        return 0
+    if width <= IMAGE_SMALL_SIDE and height <= IMAGE_SMALL_SIDE:
+        return IMAGE_TILE_TOKENS
+    return math.ceil(width / IMAGE_TILE_SIDE) * math.ceil(height / IMAGE_TILE_SIDE) * IMAGE_TILE_TOKENS
+
+
+@dataclass
+class BudgetReport:
+    """Estimated input tokens for one request after budgeting"""
+    budget: int
+    prompt_tokens: int = 0
+    context_tokens: int = 0
+    image_tokens: int = 0
+    examples_kept: int = 0
+    examples_dropped: int = 0
+    examples_truncated: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.context_tokens + self.image_tokens
+
+    @property
+    def over_budget(self) -> bool:
+        return self.total_tokens > self.budget
+
+
+class TokenBudgeter:
+    """
+    Fits retrieved examples into what is left of an input-token budget.
+    """
+
+    def __init__(self, max_input_tokens: int = 4000):
+        """
+        Initialize budgeter.
+
+        Args:
+            max_input_tokens: Target size of prompt + context + image
+        """
+        if max_input_tokens < 1:
+            raise ValueError("max_input_tokens must be positive")
+        self.max_input_tokens = max_input_tokens
+
+    def fit_examples(
+        self,
+        examples: List[Dict[str, Any]],
+        render: Callable[[List[Dict[str, Any]]], str],
+        prompt_tokens: int,
+        image_tokens: int = 0
+    ) -> Tuple[List[Dict[str, Any]], BudgetReport]:
+        """
+        Choose the examples (possibly truncated) that fit the remaining budget.
+
+        Args:
+            examples: Retrieved examples with 'similarity_score' and 'caption'
+            render: Formats a list of examples into the context text
+            prompt_tokens: Tokens of the prompt without any context
+            image_tokens: Tokens of the attached image
+
+        Returns:
+            (examples to use, in similarity order; budget report)
+        """
+        report = BudgetReport(
+            budget=self.max_input_tokens,
+            prompt_tokens=prompt_tokens,
+            image_tokens=image_tokens
+        )
+        available = self.max_input_tokens - prompt_tokens - image_tokens
+        kept = sorted(examples, key=lambda ex: ex.get('similarity_score', 0), reverse=True)
+
+        while kept:
+            context_tokens = estimate_tokens(render(kept))
+            excess = context_tokens - available
+            if excess <= 0:
+                report.context_tokens = context_tokens
+                break
+
+            # Shorten the weakest example if that is enough, otherwise drop it
+            weakest = kept[-1]
+            caption = weakest.get('caption', weakest.get('content', ''))
+            target = estimate_tokens(caption) - excess
+            if target >= MIN_TRUNCATED_TOKENS and not weakest.get('truncated'):
+                kept[-1] = dict(weakest, caption=truncate_to_tokens(caption, target), truncated=True)
+                report.examples_truncated += 1
+            else:
+                kept.pop()
+                report.examples_dropped += 1
+                if weakest.get('truncated'):
+                    report.examples_truncated -= 1
+
+        report.examples_kept = len(kept)
+        if report.examples_dropped or report.examples_truncated:
+            logger.info(
+                f"✂️ Token budget: kept {report.examples_kept} example(s), "
+                f"truncated {report.examples_truncated}, dropped {report.examples_dropped}"
+            )
+        if report.over_budget:
+            logger.warning(
+                f"⚠️ Prompt and image alone use ~{report.total_tokens} tokens "
+                f"(budget {report.budget})"
+            )
+        return kept, report
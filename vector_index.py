@@ -0,0 +1,146 @@
+"""
+Inner-Product Vector Index
+
+Holds L2-normalized embeddings as one float32 matrix next to a compact
+tuple of per-row payloads, and returns exact cosine similarities. Small
+corpora are searched with a NumPy matrix-vector product and argpartition
+top-k; past a size threshold the matrix is handed to a FAISS inner-product
+index (if faiss is installed).
+"""
+
+import logging
+from typing import Any, List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# faiss is optional: the NumPy path covers every corpus size, just slower when huge
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    faiss = None
+    FAISS_AVAILABLE = False
+
+# Rows above which search switches from NumPy to faiss.IndexFlatIP
+DEFAULT_FAISS_THRESHOLD = 20000
+
+BACKEND_NUMPY = "numpy"
+BACKEND_FAISS = "faiss"
+
+
+def normalize_rows(vectors: Any) -> np.ndarray:
+    """
+    L2-normalize vectors so inner products are cosine similarities.
+
+    Args:
+        vectors: (n, dim) or (dim,) array-like
+
+    Returns:
+        Contiguous float32 array of the same shape (zero vectors stay zero)
+    """
+    matrix = np.array(vectors, dtype=np.float32, copy=True, ndmin=1)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return np.ascontiguousarray(matrix)
+
+
+class InnerProductIndex:
+    """
+    Exact cosine-similarity search over an immutable set of rows.
+
+    Example:
+        index = InnerProductIndex(vectors, payloads)
+        for payload, score in index.search(query_vector, k=3):
+            ...
+    """
+
+    def __init__(
+        self,
+        vectors: Any,
+        payloads: Sequence[Any],
+        faiss_threshold: int = DEFAULT_FAISS_THRESHOLD
+    ):
+        """
+        Initialize index.
+
+        Args:
+            vectors: (n, dim) embeddings, normalized here
+            payloads: One object per row, returned with each hit
+            faiss_threshold: Row count from which faiss is used (if installed)
+
+        Raises:
+            ValueError: If vectors and payloads differ in length
+        """
+        self.matrix = normalize_rows(vectors)
+        if self.matrix.ndim != 2 or self.matrix.shape[0] != len(payloads):
+            raise ValueError(
+                f"Expected a ({len(payloads)}, dim) matrix, got shape {self.matrix.shape}"
+            )
+        self.payloads: Tuple[Any, ...] = tuple(payloads)
+        self._faiss_index = None
+        if FAISS_AVAILABLE and len(self.payloads) >= faiss_threshold:
+            self._faiss_index = faiss.IndexFlatIP(self.matrix.shape[1])
+            self._faiss_index.add(self.matrix)
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    @property
+    def backend(self) -> str:
+        return BACKEND_FAISS if self._faiss_index is not None else BACKEND_NUMPY
+
+    def search(self, query_vector: Any, k: int) -> List[Tuple[Any, float]]:
+        """
+        Find the k rows most similar to one query.
+
+        Args:
+            query_vector: (dim,) query embedding (normalized here)
+            k: Number of results
+
+        Returns:
+            (payload, cosine similarity) pairs, most similar first
+        """
+        return self.search_batch([query_vector], k)[0]
+
+    def search_batch(self, query_vectors: Any, k: int) -> List[List[Tuple[Any, float]]]:
+        """
+        Find the k most similar rows for each of several queries at once.
+
+        Args:
+            query_vectors: (m, dim) query embeddings (normalized here)
+            k: Number of results per query
+
+        Returns:
+            One list of (payload, cosine similarity) pairs per query
+        """
+        queries = normalize_rows(query_vectors).reshape(-1, self.matrix.shape[1])
+        k = min(k, len(self.payloads))
+        if k <= 0 or not len(queries):
+            return [[] for _ in range(len(queries))]
+
+        if self._faiss_index is not None:
+            scores, rows = self._faiss_index.search(queries, k)
+        else:
+            rows, scores = self._top_k(queries @ self.matrix.T, k)
+
+        return [
+            [(self.payloads[row], float(score)) for row, score in zip(row_ids, row_scores) if row >= 0]
+            for row_ids, row_scores in zip(rows.tolist(), scores.tolist())
+        ]
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Row ids and scores of the k best columns per row, best first"""
+        if k < scores.shape[1]:
+            # O(n) selection, then sort only the k winners
+            candidates = np.argpartition(scores, -k, axis=1)[:, -k:]
+        else:
+            candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        return (
+            np.take_along_axis(candidates, order, axis=1),
+            np.take_along_axis(candidate_scores, order, axis=1)
+        )
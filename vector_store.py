@@ -1,20 +1,114 @@
 """
 Vector Store Module for RAG Pipeline
 
-Manages brand content embeddings and similarity search using FAISS
-and sentence transformers with GPU acceleration.
+Manages brand content embeddings and cosine similarity search (NumPy,
+or FAISS inner-product for large corpora) with sentence transformers and
+GPU acceleration.
 """
 
 import os
 import json
+import sqlite3
+import re
+import hashlib
 import logging
+import threading
+import unicodedata
 import streamlit as st
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Tuple, Union
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
+
+from response_cache import DiskCache, TTLLRUCache
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL_ID = "all-MiniLM-L6-v2"
+
+# Bump when the on-disk index layout changes
+INDEX_FORMAT_VERSION = 2
+SOURCE_FILES = ("example_posts.json", "brand_voice.txt")
+BRAND_VOICE_ID = "brand_voice"
+BRAND_VOICE_TYPE = "brand_voice"
+
+_ATX_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_SETEXT_UNDERLINE = re.compile(r"^(=+|-+)\s*$")
+
+
+def example_id(example: Dict[str, Any]) -> str:
+    """
+    Stable id of an example post: its explicit 'id', else a hash of platform and caption.
+    
+    Posts need an explicit 'id' to be editable in place; with the hash
+    fallback a caption edit is seen as a delete plus an add.
+    """
+    if example.get('id') is not None:
+        return str(example['id'])
+    digest = hashlib.sha1(f"{example.get('platform', 'general')}\x00{example['caption']}".encode('utf-8'))
+    return f"post-{digest.hexdigest()[:12]}"
+
+
+def split_guideline_sections(text: str) -> List[Dict[str, str]]:
+    """
+    Split markdown brand guidelines into one section per heading.
+    
+    Nested headings keep their parents in the title ("Tone & Style > Professional Tone"),
+    a document title shared by every section is left out, and headings with no
+    text of their own are skipped.
+    
+    Args:
+        text: Contents of brand_voice.txt
+        
+    Returns:
+        Sections with 'id', 'title' and 'body', in file order
+    """
+    lines = text.splitlines()
+    sections = []
+    path: List[Tuple[int, str]] = []
+    body: List[str] = []
+    
+    def flush() -> None:
+        content = "\n".join(body).strip()
+        if content and path:
+            sections.append({'path': [title for _, title in path], 'body': content})
+        body.clear()
+    
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        heading = _ATX_HEADING.match(line)
+        if heading:
+            level, title = len(heading.group(1)), heading.group(2)
+        elif line.strip() and i + 1 < len(lines) and _SETEXT_UNDERLINE.match(lines[i + 1]):
+            level, title = (1 if lines[i + 1].startswith("=") else 2), line.strip()
+            i += 1
+        else:
+            body.append(line)
+            i += 1
+            continue
+        flush()
+        path = [(lvl, t) for lvl, t in path if lvl < level] + [(level, title)]
+        i += 1
+    flush()
+    
+    # Drop a document title that every section sits under
+    if len({tuple(section['path'][:1]) for section in sections}) == 1 and all(len(s['path']) > 1 for s in sections):
+        for section in sections:
+            section['path'] = section['path'][1:]
+    
+    seen: Dict[str, int] = {}
+    for section in sections:
+        path = section.pop('path')
+        section['title'] = " > ".join(path)
+        slug = "/".join(re.sub(r"[^a-z0-9]+", "-", part.lower()).strip("-") or "section" for part in path)
+        seen[slug] = seen.get(slug, 0) + 1
+        section['id'] = f"{BRAND_VOICE_ID}#{slug}" + (f"-{seen[slug]}" if seen[slug] > 1 else "")
+    return sections
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
 # GPU-accelerated embedding model loading
 @st.cache_resource
 def load_embedding_model():
@@ -33,7 +127,7 @@ def load_embedding_model():
         logger.info(f"🚀 Loading embedding model onto {device.upper()}...")
         
         embeddings = HuggingFaceEmbeddings(
-            model_name="all-MiniLM-L6-v2",  # Fast, efficient model
+            model_name=EMBEDDING_MODEL_ID,  # Fast, efficient model
             model_kwargs={'device': device},
             encode_kwargs={
                 'normalize_embeddings': True,
@@ -53,6 +147,88 @@ def load_embedding_model():
         return None
 
 
+class QueryEmbeddingCache:
+    """
+    Query embeddings keyed by normalized query text and embedding model id.
+    """
+    
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024, disk_path: Optional[str] = None):
+        """
+        Initialize query embedding cache.
+        
+        Args:
+            max_bytes: Size cap of the in-process tier
+            disk_path: SQLite file for the persistent tier (None to disable)
+        """
+        self.memory = TTLLRUCache(max_bytes=max_bytes, ttl_seconds=None)
+        self.disk = DiskCache(disk_path) if disk_path else None
+    
+    @staticmethod
+    def make_key(query: str, model_id: str) -> str:
+        # Whitespace and Unicode form don't change what the user asked for
+        normalized = " ".join(unicodedata.normalize("NFC", query).split())
+        return hashlib.sha256(f"{model_id}\x00{normalized}".encode("utf-8")).hexdigest()
+    
+    def get(self, query: str, model_id: str) -> Optional[List[float]]:
+        """Cached embedding, or None on a miss"""
+        import numpy as np
+        
+        key = self.make_key(query, model_id)
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            try:
+                value = self.disk.get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Query embedding disk cache read failed: {e}")
+            if value is not None:
+                self.memory.put(key, value, size=len(value))
+        return np.frombuffer(value, dtype=np.float32).tolist() if value is not None else None
+    
+    def put(self, query: str, model_id: str, vector: List[float]) -> None:
+        """Store a query embedding in every tier"""
+        import numpy as np
+        
+        key = self.make_key(query, model_id)
+        value = np.asarray(vector, dtype=np.float32).tobytes()
+        self.memory.put(key, value, size=len(value))
+        if self.disk is not None:
+            try:
+                self.disk.put(key, value)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Query embedding disk cache write failed: {e}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit-rate counters for every tier"""
+        stats = {'memory': self.memory.get_stats()}
+        if self.disk is not None:
+            stats['disk'] = self.disk.get_stats()
+        return stats
+
+
+@dataclass(frozen=True)
+class _IndexSet:
+    """Example indexes (global and per platform) plus the guideline index, swapped in as one object"""
+    all_documents: Any = None
+    by_platform: Dict[str, Any] = field(default_factory=dict)
+    guidelines: Any = None
+    version: int = 0
+
+
+def _result_payload(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields returned by retrieve_similar or retrieve_guidelines for one indexed record"""
+    metadata = record['metadata']
+    if metadata.get('type') == BRAND_VOICE_TYPE:
+        return {'id': metadata.get('id'), 'section': metadata.get('section', ''), 'content': metadata.get('body', '')}
+    return {
+        'id': metadata.get('id'),
+        'content': record['text'],
+        'caption': metadata.get('caption', ''),
+        'hashtags': metadata.get('hashtags', []),
+        'platform': metadata.get('platform', 'general'),
+        'tone': metadata.get('tone', 'neutral')
+    }
+
+
 @dataclass
 class BrandExample:
     """Represents a brand content example"""
@@ -67,27 +243,61 @@ class BrandExample:
 class BrandVectorStore:
     """
     Manages brand content in vector database for RAG retrieval.
-    Uses FAISS for fast similarity search with GPU-accelerated embeddings.
+    Uses exact inner-product search over normalized GPU-accelerated embeddings.
     """
     
-    def __init__(self, content_dir: str = "brand_content"):
+    def __init__(
+        self,
+        content_dir: str = "brand_content",
+        embeddings=None,
+        index_dir: Optional[str] = None,
+        model_id: Optional[str] = None,
+        query_cache: Optional[QueryEmbeddingCache] = None
+    ):
         """
         Initialize vector store.
         
         Args:
             content_dir: Directory containing brand content files
+            embeddings: Embedding model (loads the cached GPU model if None)
+            index_dir: Where the persisted index lives (default: <content_dir>_index next to it)
+            model_id: Embedding model identity recorded in the index manifest
+            query_cache: Cache of query embeddings (in-memory only if None)
         """
         self.content_dir = Path(content_dir)
-        self.embeddings = load_embedding_model()
-        self.vector_store = None
+        self.index_dir = Path(index_dir) if index_dir else self.content_dir.with_name(f"{self.content_dir.name}_index")
+        self.embeddings = embeddings if embeddings is not None else load_embedding_model()
+        self.model_id = model_id or (EMBEDDING_MODEL_ID if embeddings is None else type(embeddings).__name__)
+        self._index = _IndexSet()
+        self.query_cache = query_cache or QueryEmbeddingCache()
         self.examples = []
+        self.loaded_from_disk = False
+        # id -> {'text', 'text_hash', 'metadata', 'vector'} for every indexed document
+        self._records: Dict[str, Dict[str, Any]] = {}
+        # Records as last read from brand_content/, for diffing on change
+        self._source_records: Dict[str, Dict[str, Any]] = {}
+        self._source_manifest: Optional[Dict[str, Any]] = None
+        # Serializes writers; readers use whichever index reference they grabbed
+        self._write_lock = threading.RLock()
+        self.watcher: Optional["BrandContentWatcher"] = None
         
         if self.embeddings is None:
             logger.warning("⚠️ Vector store disabled (embeddings not available)")
     
+    @property
+    def index_version(self) -> int:
+        """Incremented whenever a rebuilt index is swapped in (0 until loaded)"""
+        return self._index.version
+    
+    @property
+    def vector_store(self):
+        """InnerProductIndex over every document (None until loaded)"""
+        return self._index.all_documents
+    
     def load_brand_content(self) -> bool:
         """
         Load brand guidelines and example posts into vector store.
+        Reuses persisted vectors for every document whose text and embedding model are unchanged.
         
         Returns:
             bool: True if successful, False otherwise
@@ -96,69 +306,345 @@ class BrandVectorStore:
             return False
         
         try:
-            from langchain.vectorstores import FAISS
-            from langchain.docstore.document import Document
-            
-            documents = []
-            
-            # Load example posts
-            examples_file = self.content_dir / "example_posts.json"
-            if examples_file.exists():
-                with open(examples_file, 'r', encoding='utf-8') as f:
-                    examples_data = json.load(f)
-                    
-                for ex in examples_data:
-                    # Create searchable text
-                    text = f"{ex['caption']} {' '.join(ex.get('hashtags', []))}"
-                    
-                    # Create document with metadata
-                    doc = Document(
-                        page_content=text,
-                        metadata={
-                            'platform': ex.get('platform', 'general'),
-                            'tone': ex.get('tone', 'neutral'),
-                            'engagement': ex.get('engagement', 'unknown'),
-                            'caption': ex['caption'],
-                            'hashtags': ex.get('hashtags', [])
-                        }
-                    )
-                    documents.append(doc)
-                    self.examples.append(BrandExample(**ex, metadata={}))
-            
-            # Load brand voice guidelines
-            voice_file = self.content_dir / "brand_voice.txt"
-            if voice_file.exists():
-                with open(voice_file, 'r', encoding='utf-8') as f:
-                    voice_text = f.read()
-                    
-                doc = Document(
-                    page_content=voice_text,
-                    metadata={'type': 'brand_voice'}
-                )
-                documents.append(doc)
-            
-            if not documents:
-                logger.warning("⚠️ No brand content found to load")
-                return False
-            
-            # Create FAISS vector store
-            logger.info(f"📚 Creating vector store from {len(documents)} documents...")
-            self.vector_store = FAISS.from_documents(
-                documents,
-                self.embeddings
-            )
+            import vector_index  # noqa: F401
+            
+            with self._write_lock:
+                records = self._read_sources()
+                
+                if not records:
+                    logger.warning("⚠️ No brand content found to load")
+                    return False
+                
+                manifest = self._build_manifest()
+                saved_manifest, saved_vectors = self._load_index()
+                embedded = self._embed_records(records, saved_vectors)
+                self.loaded_from_disk = embedded == 0 and saved_manifest == manifest
+                
+                self._records = records
+                self._source_records = {rid: dict(r) for rid, r in records.items()}
+                self._source_manifest = manifest
+                self._rebuild_index()
+                if not self.loaded_from_disk:
+                    self._save_index(manifest)
             
-            logger.info(f"✅ Vector store created with {len(documents)} documents")
+            if self.loaded_from_disk:
+                logger.info(f"💾 Loaded persisted index with {len(records)} documents from {self.index_dir}")
+            logger.info(f"✅ Vector store created with {len(records)} documents ({embedded} embedded)")
             return True
             
         except ImportError as e:
-            logger.error(f"❌ FAISS not available: {e}")
-            logger.error("💡 Install: pip install faiss-cpu")
+            logger.error(f"❌ Vector search not available: {e}")
+            logger.error("💡 Install: pip install numpy faiss-cpu")
             return False
         except Exception as e:
             logger.error(f"❌ Failed to load brand content: {e}")
             return False
     
+    def add_examples(self, examples: Iterable[Dict[str, Any]]) -> int:
+        """
+        Add new example posts to the live index.
+        
+        Args:
+            examples: Posts in the example_posts.json format (optional 'id')
+            
+        Returns:
+            Number of documents embedded
+            
+        Raises:
+            ValueError: If an example id is already indexed
+        """
+        records = self._example_records(examples)
+        with self._write_lock:
+            existing = [rid for rid in records if rid in self._records]
+            if existing:
+                raise ValueError(f"Examples already indexed: {', '.join(existing)}")
+            return self._apply_changes(upserts=records)
+    
+    def update_examples(self, examples: Iterable[Dict[str, Any]]) -> int:
+        """
+        Replace indexed example posts that share the given ids.
+        
+        Returns:
+            Number of documents re-embedded (unchanged texts are skipped)
+            
+        Raises:
+            KeyError: If an example id is not indexed
+        """
+        records = self._example_records(examples)
+        with self._write_lock:
+            missing = [rid for rid in records if rid not in self._records]
+            if missing:
+                raise KeyError(f"Examples not indexed: {', '.join(missing)}")
+            return self._apply_changes(upserts=records)
+    
+    def delete_examples(self, ids: Iterable[str]) -> int:
+        """
+        Remove example posts from the live index.
+        
+        Returns:
+            Number of documents removed
+        """
+        with self._write_lock:
+            doomed = [rid for rid in ids if rid in self._records]
+            self._apply_changes(deletes=doomed)
+            return len(doomed)
+    
+    def refresh_from_sources(self) -> Dict[str, int]:
+        """
+        Apply edits made to brand_content/ since the last load.
+        Only added or changed documents are embedded.
+        
+        Returns:
+            Counts of added, updated and deleted documents
+        """
+        with self._write_lock:
+            manifest = self._build_manifest()
+            if manifest == self._source_manifest:
+                return {'added': 0, 'updated': 0, 'deleted': 0}
+            
+            old = self._source_records
+            new = self._read_sources()
+            upserts = {
+                rid: record for rid, record in new.items()
+                if rid not in old or old[rid]['text_hash'] != record['text_hash']
+                or old[rid]['metadata'] != record['metadata']
+            }
+            deletes = [rid for rid in old if rid not in new]
+            counts = {
+                'added': sum(1 for rid in upserts if rid not in old),
+                'updated': sum(1 for rid in upserts if rid in old),
+                'deleted': len(deletes)
+            }
+            
+            self._apply_changes(upserts=upserts, deletes=deletes)
+            self._source_records = {rid: dict(r) for rid, r in new.items()}
+            self._source_manifest = manifest
+            self._save_index(manifest)
+        
+        logger.info(
+            f"🔄 Brand content refreshed: {counts['added']} added, "
+            f"{counts['updated']} updated, {counts['deleted']} deleted"
+        )
+        return counts
+    
+    def _apply_changes(
+        self,
+        upserts: Optional[Dict[str, Dict[str, Any]]] = None,
+        deletes: Iterable[str] = ()
+    ) -> int:
+        """Embed changed records, then swap in a rebuilt index (caller holds the write lock)."""
+        upserts = upserts or {}
+        reusable = {rid: (r['text_hash'], r['vector']) for rid, r in self._records.items()}
+        embedded = self._embed_records(upserts, reusable)
+        
+        records = dict(self._records)
+        for rid in deletes:
+            records.pop(rid, None)
+        records.update(upserts)
+        self._records = records
+        self._rebuild_index()
+        return embedded
+    
+    def _embed_records(
+        self,
+        records: Dict[str, Dict[str, Any]],
+        reusable: Optional[Dict[str, Tuple[str, Any]]] = None
+    ) -> int:
+        """Fill in record vectors, embedding only texts without a reusable vector."""
+        reusable = reusable or {}
+        pending = []
+        for rid, record in records.items():
+            text_hash, vector = reusable.get(rid, (None, None))
+            if vector is not None and text_hash == record['text_hash']:
+                record['vector'] = vector
+            else:
+                pending.append(record)
+        
+        if pending:
+            logger.info(f"📚 Embedding {len(pending)} document(s)...")
+            vectors = self.embeddings.embed_documents([r['text'] for r in pending])
+            for record, vector in zip(pending, vectors):
+                record['vector'] = list(vector)
+        return len(pending)
+    
+    def _rebuild_index(self) -> None:
+        """Build fresh search indexes from record vectors and swap them in atomically."""
+        from vector_index import InnerProductIndex
+        
+        def build(records: List[Dict[str, Any]]) -> InnerProductIndex:
+            # Result fields are assembled once here rather than on every query
+            return InnerProductIndex(
+                [r['vector'] for r in records],
+                [_result_payload(r) for r in records]
+            )
+        
+        # Guideline sections get their own index so they never displace example posts
+        records = []
+        guidelines = []
+        for record in self._records.values():
+            (guidelines if record['metadata'].get('type') == BRAND_VOICE_TYPE else records).append(record)
+        
+        # Per-platform sub-indexes make filtered search exact instead of over-fetching
+        by_platform: Dict[str, List[Dict[str, Any]]] = {}
+        for record in records:
+            platform = record['metadata'].get('platform')
+            if platform:
+                by_platform.setdefault(platform, []).append(record)
+        
+        new_index = _IndexSet(
+            all_documents=build(records) if records else None,
+            by_platform={platform: build(subset) for platform, subset in by_platform.items()},
+            guidelines=build(guidelines) if guidelines else None,
+            version=self._index.version + 1
+        )
+        # Single reference assignment: in-flight searches keep using the old indexes
+        self._index = new_index
+    
+    def _example_records(self, examples: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Turn example posts into id-keyed records."""
+        records = {}
+        for ex in examples:
+            # Create searchable text
+            text = f"{ex['caption']} {' '.join(ex.get('hashtags', []))}"
+            rid = example_id(ex)
+            if rid in records:
+                logger.warning(f"⚠️ Duplicate example id '{rid}', keeping the last one")
+            records[rid] = {
+                'text': text,
+                'text_hash': _text_hash(text),
+                'metadata': {
+                    'id': rid,
+                    'platform': ex.get('platform', 'general'),
+                    'tone': ex.get('tone', 'neutral'),
+                    'engagement': ex.get('engagement', 'unknown'),
+                    'caption': ex['caption'],
+                    'hashtags': ex.get('hashtags', [])
+                }
+            }
+        return records
+    
+    def _read_sources(self) -> Dict[str, Dict[str, Any]]:
+        """Read example posts and brand voice into id-keyed records."""
+        records = {}
+        self.examples = []
+        
+        # Load example posts
+        examples_file = self.content_dir / "example_posts.json"
+        if examples_file.exists():
+            with open(examples_file, 'r', encoding='utf-8') as f:
+                examples_data = json.load(f)
+            
+            records.update(self._example_records(examples_data))
+            example_fields = {f.name for f in fields(BrandExample)} - {'metadata'}
+            for ex in examples_data:
+                self.examples.append(BrandExample(
+                    platform=ex.get('platform', 'general'),
+                    caption=ex['caption'],
+                    hashtags=ex.get('hashtags', []),
+                    tone=ex.get('tone', 'neutral'),
+                    engagement=ex.get('engagement', 'unknown'),
+                    metadata={k: v for k, v in ex.items() if k not in example_fields}
+                ))
+        
+        # Load brand voice guidelines, one record per section
+        voice_file = self.content_dir / "brand_voice.txt"
+        if voice_file.exists():
+            with open(voice_file, 'r', encoding='utf-8') as f:
+                voice_text = f.read()
+            for section in split_guideline_sections(voice_text):
+                text = f"{section['title']}\n{section['body']}"
+                records[section['id']] = {
+                    'text': text,
+                    'text_hash': _text_hash(text),
+                    'metadata': {
+                        'id': section['id'],
+                        'type': BRAND_VOICE_TYPE,
+                        'section': section['title'],
+                        'body': section['body']
+                    }
+                }
+        
+        return records
+    
+    def _build_manifest(self) -> Dict[str, Any]:
+        """Describe the current sources and embedding model."""
+        sources = {}
+        for name in SOURCE_FILES:
+            path = self.content_dir / name
+            if path.exists():
+                sources[name] = hashlib.sha256(path.read_bytes()).hexdigest()
+        return {
+            'format_version': INDEX_FORMAT_VERSION,
+            'model_id': self.model_id,
+            'sources': sources
+        }
+    
+    def _load_index(self) -> Tuple[Optional[Dict[str, Any]], Dict[str, Tuple[str, Any]]]:
+        """
+        Load persisted vectors built with the current embedding model.
+        
+        Returns:
+            (saved manifest or None, id -> (text_hash, vector) for reuse)
+        """
+        manifest_file = self.index_dir / "manifest.json"
+        vectors_file = self.index_dir / "vectors.npy"
+        records_file = self.index_dir / "records.json"
+        if not (manifest_file.exists() and vectors_file.exists() and records_file.exists()):
+            return None, {}
+        
+        try:
+            import numpy as np
+            
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('format_version') != INDEX_FORMAT_VERSION or saved.get('model_id') != self.model_id:
+                logger.info("♻️ Embedding model or index format changed, re-embedding")
+                return None, {}
+            
+            with open(records_file, 'r', encoding='utf-8') as f:
+                saved_records = json.load(f)
+            vectors = np.load(vectors_file, allow_pickle=False)
+            if vectors.shape[0] != len(saved_records):
+                return None, {}
+            
+            if saved['sources'] != self._build_manifest()['sources']:
+                logger.info("♻️ Brand sources changed, embedding only new or edited documents")
+            return saved, {
+                r['id']: (r['text_hash'], row.tolist())
+                for r, row in zip(saved_records, vectors)
+            }
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring unreadable persisted index: {e}")
+            return None, {}
+    
+    def _save_index(self, manifest: Dict[str, Any]) -> None:
+        """Persist vectors and record ids, then the manifest, so a partial write is never treated as valid."""
+        try:
+            import numpy as np
+            
+            records = list(self._records.items())
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            manifest_file = self.index_dir / "manifest.json"
+            if manifest_file.exists():
+                manifest_file.unlink()
+            
+            tmp_vectors = self.index_dir / "vectors.tmp.npy"
+            np.save(tmp_vectors, np.asarray([r['vector'] for _, r in records], dtype=np.float32), allow_pickle=False)
+            os.replace(tmp_vectors, self.index_dir / "vectors.npy")
+            
+            tmp_records = self.index_dir / "records.tmp.json"
+            with open(tmp_records, 'w', encoding='utf-8') as f:
+                json.dump([{'id': rid, 'text_hash': r['text_hash']} for rid, r in records], f)
+            os.replace(tmp_records, self.index_dir / "records.json")
+            
+            tmp_manifest = self.index_dir / "manifest.tmp.json"
+            with open(tmp_manifest, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp_manifest, manifest_file)
+            logger.info(f"💾 Persisted vector index to {self.index_dir}")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not persist vector index: {e}")
+    
     def retrieve_similar(
         self,
         query: str,
@@ -176,36 +662,24 @@ class BrandVectorStore:
         Returns:
             List of similar examples with metadata
         """
-        if self.vector_store is None:
+        # Grab one index reference; a concurrent refresh swaps in a new one
+        index = self._index
+        if index.all_documents is None:
             logger.warning("⚠️ Vector store not initialized")
             return []
         
+        # Search only the platform's own sub-index so rare platforms still get k results
+        vector_store = index.by_platform.get(filter_platform) if filter_platform else index.all_documents
+        if vector_store is None:
+            logger.info(f"ℹ️ No brand examples for platform '{filter_platform}'")
+            return []
+        
         try:
-            # Perform similarity search
-            results = self.vector_store.similarity_search_with_score(
-                query,
-                k=k * 2  # Get more, then filter
-            )
-            
-            # Filter and format results
-            filtered_results = []
-            for doc, score in results:
-                # Apply platform filter if specified
-                if filter_platform:
-                    if doc.metadata.get('platform') != filter_platform:
-                        continue
-                
-                filtered_results.append({
-                    'content': doc.page_content,
-                    'caption': doc.metadata.get('caption', ''),
-                    'hashtags': doc.metadata.get('hashtags', []),
-                    'platform': doc.metadata.get('platform', 'general'),
-                    'tone': doc.metadata.get('tone', 'neutral'),
-                    'similarity_score': float(1 - score)  # Convert distance to similarity
-                })
-                
-                if len(filtered_results) >= k:
-                    break
+            # Scores are cosine similarities of the normalized embeddings
+            filtered_results = [
+                dict(payload, similarity_score=score)
+                for payload, score in vector_store.search(self.embed_query(query), k)
+            ]
             
             logger.info(f"🔍 Retrieved {len(filtered_results)} similar examples")
             return filtered_results
@@ -214,34 +688,262 @@ class BrandVectorStore:
             logger.error(f"❌ Retrieval failed: {e}")
             return []
     
+    def retrieve_similar_batch(
+        self,
+        queries: Sequence[str],
+        k: int = 3,
+        filters: Union[None, str, Sequence[Optional[str]]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve k most similar brand examples for each of several queries.
+        
+        Each distinct query is encoded at most once, and each distinct platform
+        filter is answered by one batched search of its sub-index.
+        
+        Args:
+            queries: Search queries
+            k: Number of results per query
+            filters: One platform filter for all queries, or one per query (None = no filter)
+            
+        Returns:
+            One list per query, shaped like retrieve_similar's result
+            
+        Raises:
+            ValueError: If filters is a sequence of a different length than queries
+        """
+        if filters is None or isinstance(filters, str):
+            filters = [filters] * len(queries)
+        if len(filters) != len(queries):
+            raise ValueError(f"Got {len(filters)} filters for {len(queries)} queries")
+        
+        results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        index = self._index
+        if index.all_documents is None:
+            logger.warning("⚠️ Vector store not initialized")
+            return results
+        if not queries:
+            return results
+        
+        try:
+            vectors = self.embed_queries(queries)
+            positions_by_filter: Dict[Optional[str], List[int]] = {}
+            for i, platform in enumerate(filters):
+                positions_by_filter.setdefault(platform, []).append(i)
+            
+            for platform, positions in positions_by_filter.items():
+                vector_store = index.by_platform.get(platform) if platform else index.all_documents
+                if vector_store is None:
+                    logger.info(f"ℹ️ No brand examples for platform '{platform}'")
+                    continue
+                hits = vector_store.search_batch([vectors[i] for i in positions], k)
+                for i, query_hits in zip(positions, hits):
+                    results[i] = [dict(payload, similarity_score=score) for payload, score in query_hits]
+            
+            logger.info(f"🔍 Retrieved {sum(map(len, results))} similar examples for {len(queries)} queries")
+            return results
+            
+        except Exception as e:
+            logger.error(f"❌ Batch retrieval failed: {e}")
+            return [[] for _ in queries]
+    
+    def retrieve_guidelines(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Retrieve the brand voice guideline sections most relevant to a query.
+        
+        Args:
+            query: Search query (keywords, target platforms)
+            k: Number of sections to return
+            
+        Returns:
+            Sections with 'id', 'section' (heading path), 'content' and 'similarity_score'
+        """
+        guidelines = self._index.guidelines
+        if guidelines is None:
+            return []
+        
+        try:
+            sections = [
+                dict(payload, similarity_score=score)
+                for payload, score in guidelines.search(self.embed_query(query), k)
+            ]
+            logger.info(f"📐 Retrieved {len(sections)} brand guideline sections")
+            return sections
+            
+        except Exception as e:
+            logger.error(f"❌ Guideline retrieval failed: {e}")
+            return []
+    
+    def retrieve_guidelines_batch(self, queries: Sequence[str], k: int = 3) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve relevant guideline sections for several queries with one encoder batch and one search.
+        
+        Args:
+            queries: Search queries
+            k: Number of sections per query
+            
+        Returns:
+            One list per query, shaped like retrieve_guidelines' result
+        """
+        guidelines = self._index.guidelines
+        if guidelines is None or not queries:
+            return [[] for _ in queries]
+        
+        try:
+            hits = guidelines.search_batch(self.embed_queries(queries), k)
+            return [
+                [dict(payload, similarity_score=score) for payload, score in query_hits]
+                for query_hits in hits
+            ]
+        except Exception as e:
+            logger.error(f"❌ Guideline retrieval failed: {e}")
+            return [[] for _ in queries]
+    
+    def embed_queries(self, queries: Sequence[str]) -> List[List[float]]:
+        """
+        Embed several search queries, encoding each distinct cache miss once.
+        
+        Misses go through embed_query rather than embed_documents: models with
+        query/passage prefixes embed the two differently, and the cache entry is
+        shared with embed_query.
+        
+        Args:
+            queries: Search texts
+            
+        Returns:
+            One embedding per query, in order
+        """
+        encoded: Dict[str, List[float]] = {}
+        for query in queries:
+            if query not in encoded:
+                encoded[query] = self.embed_query(query)
+        return [encoded[query] for query in queries]
+    
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a search query, skipping the encoder for repeated queries.
+        
+        Args:
+            query: Search text
+            
+        Returns:
+            Query embedding
+        """
+        vector = self.query_cache.get(query, self.model_id)
+        if vector is None:
+            vector = list(self.embeddings.embed_query(query))
+            self.query_cache.put(query, self.model_id, vector)
+        return vector
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get vector store statistics"""
         return {
-            'total_examples': len(self.examples),
+            'total_examples': sum(1 for r in self._records.values() if r['metadata'].get('type') != BRAND_VOICE_TYPE),
+            'guideline_sections': len(self._index.guidelines) if self._index.guidelines is not None else 0,
             'is_loaded': self.vector_store is not None,
-            'embedding_model': 'all-MiniLM-L6-v2',
-            'vector_db': 'FAISS'
+            'platforms': sorted(self._index.by_platform),
+            'index_version': self.index_version,
+            'query_cache': self.query_cache.get_stats(),
+            'embedding_model': self.model_id,
+            'vector_db': self.vector_store.backend if self.vector_store is not None else None,
+            'loaded_from_disk': self.loaded_from_disk
         }
 
 
+class BrandContentWatcher:
+    """
+    Polls brand_content/ and applies edits to a live BrandVectorStore.
+    """
+    
+    def __init__(self, store: BrandVectorStore, interval: float = 5.0):
+        """
+        Initialize watcher.
+        
+        Args:
+            store: Vector store to keep in sync
+            interval: Seconds between checks of the source files
+        """
+        self.store = store
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._signature = self._stat_signature()
+    
+    def _stat_signature(self) -> Tuple:
+        signature = []
+        for name in SOURCE_FILES:
+            try:
+                stat = (self.store.content_dir / name).stat()
+                signature.append((name, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append((name, None, None))
+        return tuple(signature)
+    
+    def check(self) -> bool:
+        """
+        Refresh the store if any source file changed since the last check.
+        
+        Returns:
+            bool: True if a refresh ran
+        """
+        signature = self._stat_signature()
+        if signature == self._signature:
+            return False
+        try:
+            self.store.refresh_from_sources()
+        except Exception as e:
+            # Keep serving the current index; retry on the next change
+            logger.error(f"❌ Brand content refresh failed: {e}")
+        self._signature = signature
+        return True
+    
+    def start(self) -> None:
+        """Start polling on a daemon thread (no-op if already running)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="brand-content-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"👀 Watching {self.store.content_dir} for changes every {self.interval:.0f}s")
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+    
+    def stop(self) -> None:
+        """Stop polling"""
+        self._stop.set()
+
+
 # Initialize global vector store (cached)
 @st.cache_resource
-def get_vector_store(content_dir: str = "brand_content") -> Optional[BrandVectorStore]:
+def get_vector_store(
+    content_dir: str = "brand_content",
+    watch_interval: float = 5.0,
+    cache_dir: str = ""
+) -> Optional[BrandVectorStore]:
     """
     Get or create cached vector store instance.
     
     Args:
         content_dir: Directory with brand content
+        watch_interval: Seconds between checks for edited brand content (0 disables)
+        cache_dir: Directory for the persistent query embedding cache (empty disables)
         
     Returns:
         BrandVectorStore or None if initialization fails
     """
     try:
-        store = BrandVectorStore(content_dir)
+        query_cache = QueryEmbeddingCache(
+            disk_path=os.path.join(cache_dir, "query_embeddings.sqlite3") if cache_dir else None
+        )
+        store = BrandVectorStore(content_dir, query_cache=query_cache)
         
         # Try to load content
         if store.load_brand_content():
             logger.info("🎯 Vector store ready for RAG retrieval")
+            if watch_interval > 0:
+                store.watcher = BrandContentWatcher(store, watch_interval)
+                store.watcher.start()
             return store
         else:
             logger.warning("⚠️ Vector store created but no content loaded")